@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#
+# This file is part of encyc-front
+#
+
+description = """bench-prepare - Compares article body link rewriters."""
+
+epilog = """
+Page.prepare() used to build a BeautifulSoup tree for each article body,
+rewrite the `a.encyc` links, and re-serialize the body with prettify().
+It now uses the single-pass rewriter in wikiprox.links.
+
+This script runs both over the article bodies in wikiprox.sample_data and
+reports CPU time and output size for each.  The sample bodies are raw
+MediaWiki output so internal links are first converted to the published
+`<a class="encyc" href="/wiki/TITLE">` form.
+
+    $ cd /opt/encyc-front/front
+    $ python bin/bench-prepare.py --rounds 100
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wikiprox import links
+from wikiprox import sample_data
+
+MEDIAWIKI_LINK = re.compile(r'<a href="/mediawiki/index.php/(?!File:)([^"]+)"')
+
+
+def prepare_soup(body):
+    """The old Page.prepare()
+    """
+    soup = BeautifulSoup(body, 'html.parser')
+    for a in soup.find_all('a', class_='encyc'):
+        a['href'] = a['href'].replace('/wiki', '')
+        if a['href'][-1] != '/':
+            a['href'] += '/'
+    return soup.prettify()
+
+def prepare_links(body):
+    """The current Page.prepare()
+    """
+    return links.rewrite_encyc_links(body)
+
+def sample_bodies():
+    """Article bodies from sample_data, with internal links as published
+
+    @returns: list of (name, body) tuples
+    """
+    bodies = []
+    for name in sorted(dir(sample_data)):
+        data = getattr(sample_data, name)
+        if isinstance(data, dict) and data.get('parse'):
+            body = data['parse']['text']['*']
+            body = MEDIAWIKI_LINK.sub(r'<a class="encyc" href="/wiki/\1"', body)
+            bodies.append((name, body))
+    return bodies
+
+def bench(function, body, rounds):
+    """Run function on body N times
+
+    @returns: (seconds per round, output)
+    """
+    start = time.process_time()
+    for n in range(rounds):
+        output = function(body)
+    elapsed = time.process_time() - start
+    return elapsed / rounds, output
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=description,
+        epilog=epilog,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '-r', '--rounds', type=int, default=50,
+        help='Number of times to run each rewriter on each body.'
+    )
+    args = parser.parse_args()
+
+    for name,body in sample_bodies():
+        print('%s (%s bytes, %s internal links)' % (
+            name, len(body.encode('utf-8')), body.count('class="encyc"')
+        ))
+        for label,function in [('soup', prepare_soup), ('links', prepare_links)]:
+            seconds,output = bench(function, body, args.rounds)
+            print('  %-6s %8.3f ms  %8s bytes' % (
+                label, seconds * 1000, len(output.encode('utf-8'))
+            ))
+
+
+if __name__ == '__main__':
+    main()
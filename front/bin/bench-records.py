@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+#
+# This file is part of encyc-front
+#
+
+description = """bench-records - Compares cached listing objects."""
+
+epilog = """
+Page.pages(), Author.authors() and Source.sources() used to cache
+lists of elasticsearch_dsl Documents.  They now cache the compact
+records in wikiprox.records.
+
+This script builds lists of each kind from synthetic search hits and
+reports pickled size and unpickling time for both.
+
+    $ cd /opt/encyc-front/front
+    $ python bin/bench-records.py --num 5000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+from elasticsearch_dsl.response.hit import Hit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wikiprox import records
+from wikiprox import repo_models
+
+
+def page_hit(n):
+    title = 'Article %s' % n
+    return {
+        '_index': 'encycarticle', '_id': title,
+        '_source': {
+            'url_title': title,
+            'public': True,
+            'published': True,
+            'published_encyc': True,
+            'published_rg': False,
+            'modified': '2020-06-%02dT12:34:56' % (n % 28 + 1),
+            'mw_api_url': 'http://dango/mediawiki/api.php?page=%s' % title,
+            'title_sort': title.lower(),
+            'title': title,
+            'description': 'A short description of article %s.' % n,
+            'authors_data': {
+                'display': ['Brian Niiya'], 'parsed': [['Niiya', 'Brian']],
+            },
+            'categories': ['Camps', 'Resettlement'],
+            'coordinates': [],
+            'source_ids': ['en-denshopd-i%s-00001-1' % n],
+        }
+    }
+
+def author_hit(n):
+    title = 'Author %s' % n
+    return {
+        '_index': 'encycauthor', '_id': title,
+        '_source': {
+            'url_title': title,
+            'public': True,
+            'published': True,
+            'modified': '2020-06-01T12:34:56',
+            'mw_api_url': 'http://dango/mediawiki/api.php?page=%s' % title,
+            'title_sort': title.lower(),
+            'title': title,
+            'body': '<p>%s is a writer.</p>' % title,
+            'article_titles': ['Article %s' % n],
+        }
+    }
+
+def source_hit(n):
+    sid = 'en-denshopd-i%s-00001-1' % n
+    return {
+        '_index': 'encycsource', '_id': sid,
+        '_source': {
+            'encyclopedia_id': sid,
+            'densho_id': 'denshopd-i%s-00001' % n,
+            'psms_id': n,
+            'institution_id': 'denshopd',
+            'created': '2015-01-01T00:00:00',
+            'modified': '2020-06-01T12:34:56',
+            'published': True,
+            'creative_commons': False,
+            'headword': 'Article %s' % n,
+            'original': '%s.jpg' % sid,
+            'original_url': 'http://m/%s.jpg' % sid,
+            'display': '%s_a.jpg' % sid,
+            'media_format': 'image',
+            'caption': 'Caption for %s' % sid,
+            'courtesy': 'Courtesy of Densho',
+            'filename': '%s.jpg' % sid,
+            'img_path': 'encyc-psms/%s_a.jpg' % sid,
+        }
+    }
+
+def document_from_hit(document_class, hit):
+    """The old *.from_hit(): a Document with the hit's fields set on it
+    """
+    obj = document_class(meta={'id': hit.meta.id})
+    for fieldname in hit.to_dict().keys():
+        setattr(obj, fieldname, getattr(hit, fieldname))
+    return obj
+
+def bench(objects, rounds):
+    """Pickle objects, then time unpickling
+
+    @returns: (bytes, seconds per round)
+    """
+    data = pickle.dumps(objects, pickle.HIGHEST_PROTOCOL)
+    start = time.process_time()
+    for n in range(rounds):
+        pickle.loads(data)
+    elapsed = time.process_time() - start
+    return len(data), elapsed / rounds
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=description,
+        epilog=epilog,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '-n', '--num', type=int, default=5000,
+        help='Number of objects in each list.'
+    )
+    parser.add_argument(
+        '-r', '--rounds', type=int, default=10,
+        help='Number of times to unpickle each list.'
+    )
+    args = parser.parse_args()
+
+    kinds = [
+        ('pages', page_hit, repo_models.Page, records.PageRecord),
+        ('authors', author_hit, repo_models.Author, records.AuthorRecord),
+        ('sources', source_hit, repo_models.Source, records.SourceRecord),
+    ]
+    for name,make_hit,document_class,record_class in kinds:
+        # round-trip through JSON so strings are not shared, as in an ES response
+        hits = [
+            Hit(json.loads(json.dumps(make_hit(n))))
+            for n in range(args.num)
+        ]
+        print('%s (%s objects)' % (name, args.num))
+        for label,objects in [
+                ('document', [document_from_hit(document_class, hit) for hit in hits]),
+                ('record', [record_class.from_hit(hit) for hit in hits]),
+        ]:
+            size,seconds = bench(objects, args.rounds)
+            print('  %-9s %10s bytes  %8.1f ms' % (label, size, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
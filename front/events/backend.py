@@ -1,25 +1,24 @@
 from datetime import datetime
 import json
 
-import requests
-
 from django.conf import settings
-from django.core.cache import cache
 
-from wikiprox import make_cache_key
+from wikiprox import cachestats
+from wikiprox import keys
+from wikiprox import upstream
 
 
 def events():
     """Returns list of events and a status message.
     """
     objects = []
-    cache_key = make_cache_key('wikiprox:events:events')
-    cached = cache.get(cache_key)
+    cache_key = keys.key('events', 'events')
+    cached = cachestats.get(cache_key)
     if cached:
         objects = json.loads(cached)
     else:
         url = '%s/events/' % settings.SOURCES_API
-        r = requests.get(
+        r = upstream.get(
             url, params={'limit':1000},
             headers={'content-type':'application/json'},
             timeout=3)
@@ -27,7 +26,7 @@ def events():
             response = json.loads(r.text)
             for obj in response['objects']:
                 objects.append(obj)
-        cache.set(cache_key, json.dumps(objects), settings.CACHE_TIMEOUT)
+        cachestats.set(cache_key, json.dumps(objects), settings.CACHE_TIMEOUT)
     # convert all the dates
     for obj in objects:
         if obj.get('start_date',None):
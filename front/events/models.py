@@ -6,12 +6,13 @@ from urllib.parse import urlparse
 
 from elasticsearch.exceptions import NotFoundError
 import elasticsearch_dsl as dsl
-import requests
 
 from django.conf import settings
 from django.db import models
 from django.urls import reverse
 
+from wikiprox import upstream
+
 MAX_SIZE = 10000
 
 
@@ -117,7 +118,7 @@ class Event(dsl.Document):
         """Gets data from encyc-psms and returns list of Events.
         """
         url = '%s/events/' % settings.SOURCES_API
-        r = requests.get(
+        r = upstream.get(
             url, params={'limit':1000},
             headers={'content-type':'application/json'},
             timeout=10)
@@ -13,5 +13,6 @@ def index(request, format=None):
         'categories': reverse('wikiprox-api-categories', request=request),
         'events': reverse('events-api-events', request=request),
         'locations': reverse('locations-api-locations', request=request),
+        'search': reverse('wikiprox-api-search', request=request),
     }
     return Response(data)
@@ -0,0 +1,226 @@
+"""front.middleware -- Whole-response cache
+
+Anonymous GET/HEAD responses are cached in Redis and served without
+running the view, so cache hits never touch Elasticsearch or upstream APIs.
+
+Timeouts are set per route in settings.CACHE_RESPONSE_TIMEOUTS, keyed by
+URL name, falling back to settings.CACHE_MIDDLEWARE_SECONDS.  A timeout
+of 0 disables caching for that route.
+
+Cache keys ignore tracking query parameters (utm_*, fbclid, ...) and the
+order of the remaining ones.  Each path has a generation number that is
+part of its keys, so purging a path is one Redis write no matter how many
+hosts, query strings or formats were cached for it.  Listings of all
+articles or authors are also keyed to the versions of their indexes.
+
+    >>> from front import middleware
+    >>> middleware.purge_article('Manzanar')
+"""
+import hashlib
+import logging
+logger = logging.getLogger(__name__)
+import uuid
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+
+from wikiprox import cachestats
+from wikiprox import versions
+
+# URL names of the views that show an article, see purge_article
+ARTICLE_URL_NAMES = [
+    'wikiprox-page',
+    'wikiprox-page-print',
+    'wikiprox-page-cite',
+    'wikiprox-related-ddr',
+    'wikiprox-api-page',
+]
+# URL names of the listings that include every article or author, and the
+# indexes they are built from (see wikiprox.versions)
+LIST_URL_NAMES = {
+    'wikiprox-index': ['article'],
+    'wikiprox-contents': ['article'],
+    'wikiprox-categories': ['article'],
+    'wikiprox-authors': ['author'],
+    'wikiprox-api-articles': ['article'],
+    'wikiprox-api-authors': ['author'],
+    'wikiprox-api-categories': ['article'],
+}
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+def _hash(text):
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def _generation_key(path):
+    return '%s:response-gen:%s' % (settings.CACHE_MIDDLEWARE_KEY_PREFIX, _hash(path))
+
+def _ignored_param(name):
+    for pattern in settings.CACHE_RESPONSE_IGNORE_PARAMS:
+        if pattern.endswith('*'):
+            if name.startswith(pattern[:-1]):
+                return True
+        elif name == pattern:
+            return True
+    return False
+
+def normalized_query(request):
+    """Query string without tracking parameters, sorted
+
+    @param request: django.http.HttpRequest
+    @returns: str
+    """
+    return '&'.join(
+        '%s=%s' % (name, value)
+        for name,values in sorted(request.GET.lists())
+        if not _ignored_param(name)
+        for value in values
+    )
+
+def _variant(request):
+    """Coarse content-negotiation bucket
+
+    DRF views render JSON or the browsable API depending on Accept.
+    Browsers (html) and everything else (json) get separate entries.
+    """
+    if 'html' in request.META.get('HTTP_ACCEPT', ''):
+        return 'html'
+    return 'json'
+
+def response_key(request, generation):
+    """Cache key for a request's response
+
+    @param request: django.http.HttpRequest
+    @param generation: str
+    @returns: str
+    """
+    return '%s:response:%s:%s' % (
+        settings.CACHE_MIDDLEWARE_KEY_PREFIX,
+        generation,
+        _hash('|'.join([
+            request.scheme,
+            request.get_host(),
+            request.path,
+            normalized_query(request),
+            _variant(request),
+        ]))
+    )
+
+def route_timeout(url_name):
+    """Seconds to cache responses from the named route
+
+    @param url_name: str
+    @returns: int
+    """
+    return settings.CACHE_RESPONSE_TIMEOUTS.get(
+        url_name, settings.CACHE_MIDDLEWARE_SECONDS
+    )
+
+def purge_path(path):
+    """Invalidate all cached responses for a path
+
+    Gives the path a new generation number; old entries become
+    unreachable and expire on their own.
+
+    @param path: str URL path, quoted or not
+    """
+    path = unquote(path)
+    cache.set(_generation_key(path), uuid.uuid4().hex[:8], None)
+    logger.debug('purged %s' % path)
+
+def purge_article(url_title):
+    """Invalidate cached responses for an article
+
+    Purges the article page, print and cite pages, related DDR objects,
+    and API record.
+
+    @param url_title: str
+    @returns: list of purged paths
+    """
+    paths = []
+    for url_name in ARTICLE_URL_NAMES:
+        path = reverse(url_name, args=[url_title]).rstrip('/')
+        paths.append(path + '/')
+        # wikiprox-page also matches without the trailing slash
+        if url_name == 'wikiprox-page':
+            paths.append(path)
+    for path in paths:
+        purge_path(path)
+    return paths
+
+def purge_lists():
+    """Invalidate cached listings of all articles
+
+    @returns: list of purged paths
+    """
+    paths = [reverse(url_name) for url_name in LIST_URL_NAMES]
+    for path in paths:
+        purge_path(path)
+    return paths
+
+
+class ResponseCacheMiddleware(object):
+    """Serve and store whole responses for anonymous GET/HEAD requests
+
+    Lookup happens in process_view so that the route's URL name is known.
+    Place after any middleware that modifies responses per-request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _cacheable_request(self, request):
+        return (request.method in CACHEABLE_METHODS) \
+            and (settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+    def _cacheable_response(self, response):
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return False
+        cache_control = response.get('Cache-Control', '')
+        for directive in ['private', 'no-cache', 'no-store']:
+            if directive in cache_control:
+                return False
+        return True
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._cacheable_request(request):
+            return None
+        timeout = route_timeout(request.resolver_match.url_name)
+        if not timeout:
+            return None
+        generation = cache.get(_generation_key(request.path)) or '0'
+        url_name = request.resolver_match.url_name
+        if url_name in LIST_URL_NAMES:
+            # listings are replaced when their indexes change
+            generation = '%s:%s' % (generation, ':'.join(
+                versions.version(model) for model in LIST_URL_NAMES[url_name]
+            ))
+        key = response_key(request, generation)
+        response = cachestats.get(key, 'response')
+        if response is None:
+            # tells __call__ to store the response
+            request._response_cache = (key, timeout)
+            return None
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not getattr(request, '_response_cache', None):
+            return response
+        key,timeout = request._response_cache
+        if not self._cacheable_response(response):
+            return response
+        response['X-Cache'] = 'MISS'
+        patch_vary_headers(response, ['Accept'])
+        if hasattr(response, 'render') and callable(response.render) \
+        and not response.is_rendered:
+            response.add_post_render_callback(
+                lambda r: cachestats.set(key, r, timeout, 'response')
+            )
+        else:
+            cachestats.set(key, response, timeout, 'response')
+        return response
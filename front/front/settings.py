@@ -102,6 +102,18 @@ MEDIA_URL_LOCAL = config.get('media', 'media_url_local')
 #elasticsearch
 DOCSTORE_HOST = config.get('elasticsearch','docstore_host')
 DOCSTORE_TIMEOUT = int(config.get('elasticsearch','docstore_timeout'))
+# one client per process (see wikiprox.docstore.get_connection)
+# max connections per node, shared by all threads
+DOCSTORE_MAXSIZE = 10
+DOCSTORE_RETRY_ON_TIMEOUT = True
+DOCSTORE_MAX_RETRIES = 2
+# discover cluster nodes on startup and on connection failure
+DOCSTORE_SNIFF = False
+DOCSTORE_SNIFF_INTERVAL = 60
+# full-index listings are read this many hits at a time
+DOCSTORE_SCAN_BATCH = 1000
+# how long ES keeps a scroll open between batches
+DOCSTORE_SCROLL = '2m'
 
 # mediawiki
 MEDIAWIKI_HTML = 'http://dango.densho.org:9066/mediawiki/index.php'
@@ -136,6 +148,31 @@ DDR_API = config.get('ddr', 'api_url')
 DDR_MEDIA_URL = config.get('ddr', 'media_url')
 DDR_MEDIA_URL_LOCAL = config.get('ddr', 'media_url_local')
 DDR_MEDIA_URL_LOCAL_MARKER = config.get('ddr', 'media_url_local_marker')
+# seconds to wait for each DDR API request
+DDR_API_TIMEOUT = 3
+# seconds to wait for all of an article's DDR topics
+DDR_DEADLINE = 5
+# max concurrent DDR API requests per process
+DDR_MAX_WORKERS = 8
+# DDR results are refreshed in the background after the soft timeout
+# and served stale until the hard timeout
+DDR_CACHE_SOFT_TIMEOUT = 60 * 5
+DDR_CACHE_HARD_TIMEOUT = 60 * 60 * 24
+# at most one background refresh per term this often; must be longer than
+# one refresh with retries (DDR_API_TIMEOUT * (UPSTREAM_RETRIES + 1))
+DDR_REFRESH_LOCK_TIMEOUT = 60
+
+# HTTP client for DDR_API and SOURCES_API (see wikiprox.upstream)
+# number of upstream hosts to keep connection pools for
+UPSTREAM_POOL_CONNECTIONS = 4
+# max connections kept open to each host; DDR_API and SOURCES_API each
+# get their own pool this size, enough for every DDR worker thread
+UPSTREAM_POOL_MAXSIZE = DDR_MAX_WORKERS
+# retries for failed GETs (connection errors, 502/503/504)
+UPSTREAM_RETRIES = 2
+UPSTREAM_BACKOFF = 0.2
+# default request timeout in seconds
+UPSTREAM_TIMEOUT = 10
 
 # search
 GOOGLE_CUSTOM_SEARCH_PASSWORD = config.get('search', 'google_custom_search_password')
@@ -192,12 +229,73 @@ CACHES = {
     }
 }
 
-# whole-site caching
+# whole-response caching (see front.middleware)
 CACHE_MIDDLEWARE_ALIAS = 'default'
 CACHE_MIDDLEWARE_SECONDS = 60 * 15
 CACHE_MIDDLEWARE_KEY_PREFIX = 'front'
+# seconds per URL name, others get CACHE_MIDDLEWARE_SECONDS, 0 = not cached
+CACHE_RESPONSE_TIMEOUTS = {
+    'wikiprox-index': 60 * 60,
+    'wikiprox-contents': 60 * 60 * 6,
+    'wikiprox-categories': 60 * 60 * 6,
+    'wikiprox-authors': 60 * 60 * 6,
+    'wikiprox-author': 60 * 60,
+    'wikiprox-page': 60 * 15,
+    'wikiprox-page-print': 60 * 15,
+    'wikiprox-page-cite': 60 * 15,
+    'wikiprox-related-ddr': 60 * 5,
+    'wikiprox-source': 60 * 60,
+    'wikiprox-source-cite': 60 * 60,
+    'wikiprox-api-articles': 60 * 60 * 6,
+    'wikiprox-api-authors': 60 * 60 * 6,
+    'wikiprox-api-categories': 60 * 60 * 6,
+    'wikiprox-api-page': 60 * 15,
+    'events-events': 60 * 60,
+    'events-api-events': 60 * 60,
+    'wikiprox-api-metrics': 0,
+    'wikiprox-search': 60 * 5,
+    'wikiprox-api-search': 60 * 5,
+}
+# query parameters left out of response cache keys
+CACHE_RESPONSE_IGNORE_PARAMS = ['utm_*', 'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid']
 # low-level caching
 CACHE_TIMEOUT = 60 * 5
+# lists keyed to index versions (see wikiprox.versions) are replaced when
+# content changes, this only clears out old versions
+CACHE_TIMEOUT_VERSIONED = 60 * 60 * 24
+# max seconds between checks for changed index contents
+INDEX_VERSION_INTERVAL = 10
+# max seconds before other processes see a cache key family invalidated
+# with wikiprox.keys.bump()
+CACHE_GENERATION_INTERVAL = 5
+# Page/Author/Source IDs that were not found are remembered this long
+# or until their index changes
+CACHE_TIMEOUT_NOTFOUND = 60 * 10
+# search aggregations, keyed to query and index versions
+CACHE_TIMEOUT_AGGS = 60 * 60
+# full-text search results (see wikiprox.fulltext), keyed to query and
+# index versions
+CACHE_TIMEOUT_SEARCH = 60 * 5
+# highlighted snippets per search result, and their length in characters
+SEARCH_FRAGMENTS = 2
+SEARCH_FRAGMENT_SIZE = 150
+# cache hit/miss counts are logged this often (see wikiprox.cachestats)
+CACHE_STATS_LOG_INTERVAL = 60 * 10
+# clients allowed to see /api/0.1/metrics/, including any proxies
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# prepared article bodies are keyed to the article's modified timestamp
+# so they only expire to clear out old revisions
+CACHE_TIMEOUT_BODY = 60 * 60 * 24 * 7
+# big lists are also kept unpickled in each worker (see wikiprox.caching)
+CACHE_LOCAL_MAX_ENTRIES = 32
+# list cache expiry is stretched by up to this fraction, at random
+CACHE_JITTER = 0.2
+# expired lists are kept this long, served while one process rebuilds
+CACHE_STALE_TIMEOUT = 60 * 60
+# max seconds one process may hold a list's rebuild lock
+CACHE_LOCK_TIMEOUT = 60
+# max seconds to wait for another process to build a missing list
+CACHE_LOCK_WAIT = 10
 
 STATIC_ROOT = '/var/www/encycfront/static/'
 MEDIA_ROOT = '/var/www/encycfront/media/'
@@ -271,14 +369,14 @@ THUMBNAIL_URL_TIMEOUT = int(config.get('media', 'thumbnail_url_timeout'))
 ##    'django.contrib.staticfiles.finders.DefaultStorageFinder',
 #)
 
-MIDDLEWARE_CLASSES = (
-    'django.middleware.cache.UpdateCacheMiddleware',
+MIDDLEWARE = (
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     #'django.middleware.csrf.CsrfViewMiddleware',
     #'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.cache.FetchFromCacheMiddleware',
+    'front.middleware.ResponseCacheMiddleware',
 )
 
 ROOT_URLCONF = 'front.urls'
@@ -32,6 +32,8 @@ urlpatterns = [
     path('api/0.1/locations/', locations_api.locations, name='locations-api-locations'),
     re_path(r"^api/0.1/sources/(?P<encyclopedia_id>[\w .:_-]+)/$", wiki_api.source, name='wikiprox-api-source'),
     path('api/0.1/sources/', wiki_api.sources, name='wikiprox-api-sources'),
+    path('api/0.1/search/', wiki_api.search, name='wikiprox-api-search'),
+    path('api/0.1/metrics/', wiki_api.metrics, name='wikiprox-api-metrics'),
     path('api/0.1/', front_api.index, name='front-api-index'),
     
     path('crossdomain.xml', TemplateView.as_view(template_name='crossdomain.xml')),
@@ -45,7 +47,7 @@ urlpatterns = [
     path('about/editorsmessage/', TemplateView.as_view(template_name='front/editorsmessage.html'), name='editorsmessage'),
     path('about/', TemplateView.as_view(template_name='front/about.html'), name='about'),
     path('history/', TemplateView.as_view(template_name='front/history.html'), name='wikiprox-history'),
-    path('search/', TemplateView.as_view(template_name='front/search.html'), name='wikiprox-search'),
+    path('search/', wiki_views.search, name='wikiprox-search'),
     path('terminology/', TemplateView.as_view(template_name='front/terminology.html')),
     #
     path('timeline/', events_views.events, name='events-events'),
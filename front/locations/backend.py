@@ -3,27 +3,27 @@ import json
 
 from lxml import etree
 from pykml.factory import KML_ElementMaker as KML
-import requests
 
 from django.conf import settings
-from django.core.cache import cache
 from django.template import loader
 from django.urls import reverse
 
-from wikiprox import make_cache_key
+from wikiprox import cachestats
+from wikiprox import keys
+from wikiprox import upstream
 
 
 def locations():
     """Returns list of locations and a status message.
     """
     locations = []
-    cache_key = make_cache_key('wikiprox:locations:locations')
-    cached = cache.get(cache_key)
+    cache_key = keys.key('locations', 'locations')
+    cached = cachestats.get(cache_key)
     if cached:
         locations = json.loads(cached)
     else:
         url = '%s/locations/' % settings.SOURCES_API
-        r = requests.get(
+        r = upstream.get(
             url, params={'limit':'1000'},
             headers={'content-type':'application/json'},
             timeout=3)
@@ -31,7 +31,7 @@ def locations():
             response = json.loads(r.text)
             for location in response['objects']:
                 locations.append(location)
-        cache.set(cache_key, json.dumps(locations), settings.CACHE_TIMEOUT)
+        cachestats.set(cache_key, json.dumps(locations), settings.CACHE_TIMEOUT)
     return locations
 
 def categories(locations):
@@ -1,6 +1,23 @@
-def make_cache_key(text):
-    MEMCACHED_CONTROL_CHARS = [' ']
-    for c in MEMCACHED_CONTROL_CHARS:
-        text = text.replace(c,'')
-    return text[:250]
+import hashlib
+import re
+
+# Redis allows any key but memcached does not allow whitespace/control chars
+UNSAFE_KEY_CHARS = re.compile(r'[\s\x00-\x1f\x7f]')
+MAX_KEY_LENGTH = 200
 
+
+def make_cache_key(text):
+    """Make a cache key that is safe for memcached as well as Redis
+    
+    Keys that are too long or contain whitespace or control characters
+    are hashed (keeping a readable prefix) instead of being stripped
+    and truncated, so different inputs never share a key.
+    
+    @param text: str
+    @returns: str
+    """
+    if (len(text) <= MAX_KEY_LENGTH) and not UNSAFE_KEY_CHARS.search(text):
+        return text
+    digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    prefix = UNSAFE_KEY_CHARS.sub('_', text)[:MAX_KEY_LENGTH - len(digest) - 1]
+    return '%s:%s' % (prefix, digest)
@@ -1,13 +1,20 @@
 from collections import OrderedDict
+import os
 
 from django.conf import settings
+from elasticsearch import TransportError
+from django.views.decorators.http import condition
 
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.reverse import reverse
 from rest_framework.response import Response
 
+from wikiprox import cachestats
+from wikiprox import fulltext
 from wikiprox import models
+from wikiprox import upstream
+from wikiprox import validators
 
 
 @api_view(['GET'])
@@ -23,6 +30,7 @@ def articles(request, format=None):
     ]
     return Response(data)
 
+@condition(etag_func=validators.page_etag, last_modified_func=validators.page_last_modified)
 @api_view(['GET'])
 def article(request, url_title, format=None):
     """DOCUMENTATION GOES HERE.
@@ -47,6 +55,11 @@ def article(request, url_title, format=None):
         reverse('wikiprox-api-author', args=([author_titles]), request=request)
         for author_titles in page.authors_data['display']
     ]
+    prev_page,next_page = page.set_prev_next()
+    if prev_page:
+        prev_page = reverse('wikiprox-api-page', args=([prev_page]), request=request)
+    if next_page:
+        next_page = reverse('wikiprox-api-page', args=([next_page]), request=request)
     data = OrderedDict(
         url_title=page.url_title,
         title_sort=page.title_sort,
@@ -66,12 +79,8 @@ def article(request, url_title, format=None):
         coordinates=page.coordinates,
         authors=authors,
         ddr_topic_terms=topic_term_ids,
-        prev_page=reverse(
-            'wikiprox-api-page', args=([page.prev_page]), request=request
-        ),
-        next_page=reverse(
-            'wikiprox-api-page', args=([page.next_page]), request=request
-        ),
+        prev_page=prev_page,
+        next_page=next_page,
     )
     return Response(data)
 
@@ -90,6 +99,7 @@ def authors(request, format=None):
     ]
     return Response(data)
 
+@condition(etag_func=validators.author_etag, last_modified_func=validators.author_last_modified)
 @api_view(['GET'])
 def author(request, url_title, format=None):
     """DOCUMENTATION GOES HERE.
@@ -148,6 +158,7 @@ def sources(request, format=None):
     # can't browse sources independent of articles
     return Response(status=status.HTTP_404_NOT_FOUND)
 
+@condition(etag_func=validators.source_etag, last_modified_func=validators.source_last_modified)
 @api_view(['GET'])
 def source(request, encyclopedia_id, format=None):
     """DOCUMENTATION GOES HERE.
@@ -194,3 +205,92 @@ def source(request, encyclopedia_id, format=None):
         creative_commons=source.creative_commons,
     )
     return Response(data)
+
+@api_view(['GET'])
+def search(request, format=None):
+    """Full-text search of articles, authors and sources
+    
+    Parameters:
+    - q: words to search for (required)
+    - models: comma-separated, any of article,author,source (default all)
+    - fields: comma-separated fields to return (default all)
+    - size: results per page (max 100)
+    - cursor: `next_cursor` from the previous page
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response(
+            {'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST
+        )
+    search_models = [m for m in request.GET.get('models', '').split(',') if m]
+    fields = [f for f in request.GET.get('fields', '').split(',') if f]
+    try:
+        results = fulltext.search(
+            query,
+            models=search_models,
+            cursor=request.GET.get('cursor'),
+            size=request.GET.get('size', fulltext.DEFAULT_SIZE),
+            fields=fields,
+        )
+    except ValueError as err:
+        return Response(
+            {'error': str(err)}, status=status.HTTP_400_BAD_REQUEST
+        )
+    except TransportError:
+        return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    data = OrderedDict(
+        query=results['query'],
+        total=results['total'],
+        next=None,
+        objects=[],
+    )
+    if results['next_cursor']:
+        params = request.GET.copy()
+        params['cursor'] = results['next_cursor']
+        data['next'] = request.build_absolute_uri('?%s' % params.urlencode())
+    for result in results['objects']:
+        data['objects'].append(OrderedDict(
+            model=result['model'],
+            id=result['id'],
+            title=result['title'],
+            links=OrderedDict(
+                json=reverse(
+                    fulltext.API_URL_NAMES[result['model']],
+                    args=([result['id']]), request=request
+                ),
+                html=reverse(
+                    fulltext.URL_NAMES[result['model']],
+                    args=([result['id']]), request=request
+                ),
+            ),
+            score=result['score'],
+            highlights=result['highlights'],
+            fields=result['fields'],
+        ))
+    return Response(data)
+
+
+def _local_request(request):
+    """True if request and any proxies it passed through are allowed
+    """
+    addrs = [request.META.get('REMOTE_ADDR')] + [
+        addr.strip()
+        for addr in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+        if addr.strip()
+    ]
+    return all(addr in settings.METRICS_ALLOWED_IPS for addr in addrs)
+
+@api_view(['GET'])
+def metrics(request, format=None):
+    """Cache and upstream API counters for the process serving the request
+    
+    Only available to settings.METRICS_ALLOWED_IPS.
+    """
+    if not _local_request(request):
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    data = OrderedDict(
+        pid=os.getpid(),
+        cache=cachestats.stats(),
+        upstream=upstream.stats(),
+    )
+    return Response(data)
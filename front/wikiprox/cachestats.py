@@ -0,0 +1,166 @@
+"""front.cachestats -- Per-family cache instrumentation
+
+Thin wrappers around cache.get/cache.set that count hits, misses and
+payload bytes for each key family (see wikiprox.keys), and time
+rebuilds: the time from a miss to the set of the same key in the same
+thread.
+
+    >>> data = cachestats.get(key)
+    >>> if data is None:
+    ...     data = build()
+    ...     cachestats.set(key, data, timeout)
+    >>> cachestats.stats()
+    {'ddr:termdocs': {'hits': 12, 'misses': 3, 'sets': 3, 'bytes': 4810,
+                      'rebuilds': 3, 'rebuild_seconds': 0.84}, ...}
+
+Strings are counted in characters, and bytes are estimated for objects
+other than strings and responses (see _payload_size).  Counts are per
+process.  They are logged every settings.CACHE_STATS_LOG_INTERVAL
+seconds and served by the cache metrics view.
+"""
+import logging
+logger = logging.getLogger(__name__)
+import pickle
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http.response import HttpResponseBase
+
+# encyc-front:FAMILY:gN:...
+FAMILY_PATTERN = re.compile(r'^[^:]+:(.+?):g\d+(:|$)')
+
+STATS = {}
+LOCK = threading.Lock()
+LOGGED = [time.time()]
+# key -> time of miss, for rebuild timing
+MISSES = threading.local()
+# misses that are never followed by a set are dropped past this many
+MAX_PENDING = 1000
+# one in this many sets of other objects is pickled to estimate bytes
+BYTES_SAMPLE = 20
+
+
+def family(key):
+    """Key family from a wikiprox.keys key, or the first two segments
+
+    @param key: str
+    @returns: str
+    """
+    match = FAMILY_PATTERN.match(key)
+    if match:
+        return match.group(1)
+    return ':'.join(key.split(':')[:2])
+
+def _payload_size(value):
+    """Size of str, bytes and response content, or an estimate
+
+    Other objects are only pickled once every BYTES_SAMPLE sets, and that
+    size is counted BYTES_SAMPLE times.
+    """
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, HttpResponseBase) and not value.streaming:
+        return len(value.content)
+    if random.randrange(BYTES_SAMPLE):
+        return 0
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) * BYTES_SAMPLE
+
+def _family_stats(name):
+    return STATS.setdefault(name, {
+        'hits': 0, 'misses': 0, 'sets': 0, 'bytes': 0,
+        'rebuilds': 0, 'rebuild_seconds': 0.0,
+    })
+
+def _pending():
+    if not hasattr(MISSES, 'keys'):
+        MISSES.keys = {}
+    return MISSES.keys
+
+def record_hit(key, name=None):
+    with LOCK:
+        _family_stats(name or family(key))['hits'] += 1
+    _maybe_log()
+
+def record_miss(key, name=None):
+    pending = _pending()
+    if len(pending) >= MAX_PENDING:
+        pending.clear()
+    pending[key] = time.time()
+    with LOCK:
+        _family_stats(name or family(key))['misses'] += 1
+    _maybe_log()
+
+def record_set(key, value, name=None):
+    missed = _pending().pop(key, None)
+    size = _payload_size(value)
+    with LOCK:
+        data = _family_stats(name or family(key))
+        data['sets'] += 1
+        data['bytes'] += size
+        if missed:
+            data['rebuilds'] += 1
+            data['rebuild_seconds'] += time.time() - missed
+
+def get(key, name=None):
+    """cache.get, counting a hit or miss
+
+    @param key: str
+    @param name: str Family name if key is not from wikiprox.keys
+    """
+    value = cache.get(key)
+    if value is None:
+        record_miss(key, name)
+    else:
+        record_hit(key, name)
+    return value
+
+def set(key, value, timeout, name=None):
+    """cache.set, counting bytes and rebuild time
+
+    @param key: str
+    @param value: any picklable object
+    @param timeout: int
+    @param name: str Family name if key is not from wikiprox.keys
+    """
+    cache.set(key, value, timeout)
+    record_set(key, value, name)
+
+def stats():
+    """Counts for each family in this process
+
+    @returns: dict
+    """
+    with LOCK:
+        return {
+            name: dict(data)
+            for name,data in STATS.items()
+        }
+
+def log_line():
+    """One line summary of stats()
+
+    @returns: str
+    """
+    return ' '.join(
+        '%s=%s/%s/%sB/%.2fs' % (
+            name, data['hits'], data['misses'], data['bytes'],
+            data['rebuild_seconds'],
+        )
+        for name,data in sorted(stats().items())
+    )
+
+def _maybe_log():
+    now = time.time()
+    if now - LOGGED[0] < settings.CACHE_STATS_LOG_INTERVAL:
+        return
+    with LOCK:
+        if now - LOGGED[0] < settings.CACHE_STATS_LOG_INTERVAL:
+            return
+        LOGGED[0] = now
+    logger.info('cache hits/misses/bytes/rebuild: %s' % log_line())
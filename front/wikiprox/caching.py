@@ -0,0 +1,146 @@
+"""front.caching -- Two-tier cache for large lists
+
+Lists like Page.pages() and Author.authors() hold thousands of
+objects.  Unpickling them from Redis on every request is expensive
+so each worker process keeps the unpickled data in a small in-memory
+LRU, validated against a version stamp stored in Redis next to the data.
+
+Rebuilding a list is also expensive, so rebuilds are single-flight.
+Data is kept in Redis past its (jittered) expiry.  When it expires one
+caller gets None and rebuilds while everyone else is served the previous
+value.  Keys from wikiprox.versions change when an index changes, so the
+new key has no previous value; each key family remembers its last key
+that was set and that is served instead.  If there is no previous value
+at all, other callers wait for the rebuild instead of starting their own.
+
+    >>> data = caching.get('encyc-front:pages')
+    >>> if not data:
+    ...     data = build_pages()
+    ...     caching.set('encyc-front:pages', data, settings.CACHE_TIMEOUT)
+
+Data returned from the local tier is shared by every request in the
+process.  Treat it as read-only.
+"""
+from collections import OrderedDict
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from wikiprox import cachestats
+from wikiprox import keys
+
+# key -> (stamp, data), most recently used last
+LOCAL = OrderedDict()
+LOCK = threading.Lock()
+
+# seconds between checks while waiting for another process's rebuild
+POLL_INTERVAL = 0.1
+
+
+def _stamp_key(key):
+    return '%s:stamp' % key
+
+def _lock_key(key):
+    return '%s:lock' % key
+
+def _latest_key(key):
+    """Pointer to the last key set in key's family (see cachestats.family)
+    """
+    return '%s:latest:%s' % (keys.PREFIX, cachestats.family(key))
+
+def _set_local(key, stamp, data):
+    with LOCK:
+        LOCAL[key] = (stamp, data)
+        LOCAL.move_to_end(key)
+        while len(LOCAL) > settings.CACHE_LOCAL_MAX_ENTRIES:
+            LOCAL.popitem(last=False)
+
+def _get(key):
+    """Get data and its expiry time from local memory or Redis
+
+    @param key: str
+    @returns: (data, expires) or None
+    """
+    stamp = cache.get(_stamp_key(key))
+    if stamp is None:
+        return None
+    stamp,expires = stamp
+    with LOCK:
+        entry = LOCAL.get(key)
+        if entry and (entry[0] == stamp):
+            LOCAL.move_to_end(key)
+            return entry[1],expires
+    data = cache.get(key)
+    if data is None:
+        return None
+    _set_local(key, stamp, data)
+    return data,expires
+
+def get(key):
+    """Get data, or None if the caller should rebuild it
+
+    @param key: str
+    @returns: data or None
+    """
+    entry = _get(key)
+    if entry:
+        data,expires = entry
+        if (time.time() < expires) or not cache.add(
+                _lock_key(key), 1, settings.CACHE_LOCK_TIMEOUT):
+            cachestats.record_hit(key)
+            return data
+        # expired and this caller holds the lock
+        cachestats.record_miss(key)
+        return None
+    if cache.add(_lock_key(key), 1, settings.CACHE_LOCK_TIMEOUT):
+        cachestats.record_miss(key)
+        return None
+    # another process is rebuilding; serve the family's previous version
+    latest = cache.get(_latest_key(key))
+    if latest and (latest != key):
+        entry = _get(latest)
+        if entry:
+            cachestats.record_hit(key)
+            return entry[0]
+    waited = 0
+    while waited < settings.CACHE_LOCK_WAIT:
+        time.sleep(POLL_INTERVAL)
+        waited += POLL_INTERVAL
+        entry = _get(key)
+        if entry:
+            cachestats.record_hit(key)
+            return entry[0]
+    cachestats.record_miss(key)
+    return None
+
+def set(key, data, timeout):
+    """Store data in Redis with a new version stamp, and in local memory
+
+    Expiry is jittered by up to settings.CACHE_JITTER of timeout so that
+    lists set together do not all expire together.  Data is kept in Redis
+    for settings.CACHE_STALE_TIMEOUT past expiry to serve during rebuilds,
+    including rebuilds under a new key in the same family.
+
+    @param key: str
+    @param data: any picklable object
+    @param timeout: int Seconds
+    """
+    timeout = timeout * (1 + random.uniform(0, settings.CACHE_JITTER))
+    stamp = uuid.uuid4().hex
+    keep = int(timeout + settings.CACHE_STALE_TIMEOUT)
+    cache.set(key, data, keep)
+    cache.set(_stamp_key(key), (stamp, time.time() + timeout), keep)
+    cache.set(_latest_key(key), key, keep)
+    cache.delete(_lock_key(key))
+    _set_local(key, stamp, data)
+    cachestats.record_set(key, data)
+
+def clear_local():
+    """Empty the in-memory tier for this process
+    """
+    with LOCK:
+        LOCAL.clear()
@@ -1,59 +1,115 @@
 """front.ddr -- Links to the DDR REST API
 """
+from concurrent.futures import ThreadPoolExecutor, wait
 import json
+import logging
+logger = logging.getLogger(__name__)
 import os
+import threading
+import time
 
 import requests
 
 from django.conf import settings
 from django.core.cache import cache
 
-from wikiprox import make_cache_key
+from wikiprox import cachestats
+from wikiprox import keys
+from wikiprox import upstream
 
+# (pid, thread pool) for DDR API requests, created on first use in each
+# process; a pool inherited across fork() has no live threads.
+EXECUTOR = (None, None)
+LOCK = threading.Lock()
+
+
+def _term_cache_key(term_id, size):
+    return keys.key('ddr:termdocs', term_id, size)
 
 def _term_documents(term_id, size):
     """Get objects for specified term from DDR REST API.
     
+    Results are cached for settings.DDR_CACHE_HARD_TIMEOUT but are only
+    fresh for settings.DDR_CACHE_SOFT_TIMEOUT.  Stale results are returned
+    immediately and refreshed in the background.
+    
     @param term_id: int
     @param size: int Maximum number of results to return.
     @returns: list of dicts
     """
-    cache_key = make_cache_key('wikiprox:ddr:termdocs:%s:%s' % (term_id,size))
-    cached = cache.get(cache_key)
-    if cached:
-        objects = json.loads(cached)
-    else:
-        url = '{api}/facet/topics/{term_id}/objects/?limit={limit}&{local}=1'.format(
-            api=settings.DDR_API,
-            term_id=term_id,
-            limit=size,
-            local=settings.DDR_MEDIA_URL_LOCAL_MARKER
-        )
-        r = requests.get(
-            url,
-            headers={'content-type':'application/json'},
-            timeout=3)
-        if (r.status_code not in [200]):
-            raise requests.exceptions.ConnectionError(
-                'Error %s' % (r.status_code))
-        objects = []
-        if ('json' in r.headers['content-type']):
-            data = json.loads(r.text)
-            if isinstance(data, dict) and data.get('objects'):
-                objects = data['objects']
-            elif isinstance(data, list):
-                objects = data
-        # add img_url_local
-        for o in objects:
-            if o.get('links',{}).get('html'):
-                o['absolute_url'] = o['links']['html']
-            if o.get('links',{}).get('thumb'):
-                o['img_url'] = o['links']['img']
-            if o.get('links',{}).get('thumb'):
-                o['img_url_local'] = o['links']['thumb']
-        cache.set(cache_key, json.dumps(objects), settings.CACHE_TIMEOUT)
+    cached = cachestats.get(_term_cache_key(term_id, size))
+    if not cached:
+        return _fetch_term_documents(term_id, size)
+    data = json.loads(cached)
+    if time.time() - data['fetched'] > settings.DDR_CACHE_SOFT_TIMEOUT:
+        _refresh_term_documents(term_id, size)
+    return data['objects']
+
+def _fetch_term_documents(term_id, size):
+    """Get objects for term from DDR REST API and cache them.
+    
+    @param term_id: int
+    @param size: int Maximum number of results to return.
+    @returns: list of dicts
+    """
+    url = '{api}/facet/topics/{term_id}/objects/?limit={limit}&{local}=1'.format(
+        api=settings.DDR_API,
+        term_id=term_id,
+        limit=size,
+        local=settings.DDR_MEDIA_URL_LOCAL_MARKER
+    )
+    r = upstream.get(
+        url,
+        headers={'content-type':'application/json'},
+        timeout=settings.DDR_API_TIMEOUT)
+    if (r.status_code not in [200]):
+        raise requests.exceptions.ConnectionError(
+            'Error %s' % (r.status_code))
+    objects = []
+    if ('json' in r.headers['content-type']):
+        data = json.loads(r.text)
+        if isinstance(data, dict) and data.get('objects'):
+            objects = data['objects']
+        elif isinstance(data, list):
+            objects = data
+    # add img_url_local
+    for o in objects:
+        if o.get('links',{}).get('html'):
+            o['absolute_url'] = o['links']['html']
+        if o.get('links',{}).get('thumb'):
+            o['img_url'] = o['links']['img']
+        if o.get('links',{}).get('thumb'):
+            o['img_url_local'] = o['links']['thumb']
+    cachestats.set(
+        _term_cache_key(term_id, size),
+        json.dumps({'fetched': time.time(), 'objects': objects}),
+        settings.DDR_CACHE_HARD_TIMEOUT
+    )
     return objects
 
+def _refresh_term_documents(term_id, size):
+    """Refresh stale term objects in the background.
+    
+    Only one process refreshes a given term at a time.  If the DDR API
+    is unavailable the stale objects stay in the cache, and the lock is
+    left to expire so the term is not retried for
+    settings.DDR_REFRESH_LOCK_TIMEOUT.
+    """
+    lock_key = '%s:refresh' % _term_cache_key(term_id, size)
+    if not cache.add(lock_key, 1, settings.DDR_REFRESH_LOCK_TIMEOUT):
+        return
+    def refresh():
+        try:
+            _fetch_term_documents(term_id, size)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+            logger.error('DDR term %s refresh failed: %s' % (term_id, err))
+            return
+        except Exception:
+            logger.exception('DDR term %s refresh failed' % term_id)
+            return
+        cache.delete(lock_key)
+    _executor().submit(refresh)
+
 def _balance(results, size):
     """cycle through term IDs taking one at a time until we have enough
     
@@ -145,14 +201,60 @@ def distribute_list(terms_objects, limit):
                 misses = misses + 1
     return objects
 
-def related_by_topic(term_ids, size):
+def _executor():
+    """Returns the ThreadPoolExecutor for this process
+    """
+    global EXECUTOR
+    pid = os.getpid()
+    if EXECUTOR[0] != pid:
+        with LOCK:
+            if EXECUTOR[0] != pid:
+                EXECUTOR = (pid, ThreadPoolExecutor(
+                    max_workers=settings.DDR_MAX_WORKERS, thread_name_prefix='ddr'
+                ))
+    return EXECUTOR[1]
+
+def related_by_topic(term_ids, size, deadline=None):
     """Documents from DDR related to terms.
     
+    Terms are requested concurrently.  Terms that have not answered
+    by the deadline, or that failed, get empty lists.  If no term
+    answers at all the error is raised.
+    
     @param term_ids: list of Topic term IDs.
     @param size: int Number of results per term.
+    @param deadline: int Seconds to wait for all terms (settings.DDR_DEADLINE)
+    @returns: dict of lists keyed to term IDs
     """
-    term_results = {
-        tid: _term_documents(tid, size)
+    if not term_ids:
+        return {}
+    if deadline is None:
+        deadline = settings.DDR_DEADLINE
+    futures = [
+        _executor().submit(_term_documents, tid, size)
         for tid in term_ids
-    }
+    ]
+    done,not_done = wait(futures, timeout=deadline)
+    term_results = {}
+    errors = []
+    for tid,future in zip(term_ids, futures):
+        term_results[tid] = []
+        if future in not_done:
+            future.cancel()
+        elif future.exception():
+            errors.append(future.exception())
+        else:
+            term_results[tid] = future.result()
+    if not_done:
+        logger.error('DDR terms timed out after %ss: %s' % (
+            deadline,
+            [tid for tid,future in zip(term_ids, futures) if future in not_done]
+        ))
+    if len(done) == len(errors):
+        # nothing came back
+        if errors:
+            raise errors[0]
+        raise requests.exceptions.Timeout(
+            'No DDR terms answered within %ss' % deadline
+        )
     return term_results
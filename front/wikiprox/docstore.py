@@ -2,6 +2,7 @@ import json
 import logging
 logger = logging.getLogger(__name__)
 import os
+import threading
 
 from elasticsearch import Elasticsearch, TransportError
 import elasticsearch_dsl
@@ -14,6 +15,48 @@ INDEX_PREFIX = 'encyc'
 
 MAX_SIZE = 10000
 
+# hosts -> Elasticsearch client, for the process in CONNECTIONS_PID
+CONNECTIONS = {}
+CONNECTIONS_PID = None
+LOCK = threading.Lock()
+
+
+def _make_connection(hosts):
+    kwargs = {
+        'timeout': settings.DOCSTORE_TIMEOUT,
+        'maxsize': settings.DOCSTORE_MAXSIZE,
+        'retry_on_timeout': settings.DOCSTORE_RETRY_ON_TIMEOUT,
+        'max_retries': settings.DOCSTORE_MAX_RETRIES,
+    }
+    if settings.DOCSTORE_SNIFF:
+        kwargs.update({
+            'sniff_on_start': True,
+            'sniff_on_connection_fail': True,
+            'sniffer_timeout': settings.DOCSTORE_SNIFF_INTERVAL,
+        })
+    return Elasticsearch(hosts, **kwargs)
+
+def get_connection(hosts=None):
+    """Returns the Elasticsearch client for hosts in this process
+    
+    Clients are created on first use and shared by all threads.
+    A forked process (e.g. a gunicorn worker) gets its own clients
+    instead of reusing its parent's sockets.
+    
+    @param hosts: str (default settings.DOCSTORE_HOST)
+    @returns: elasticsearch.Elasticsearch
+    """
+    global CONNECTIONS_PID
+    hosts = hosts or settings.DOCSTORE_HOST
+    pid = os.getpid()
+    with LOCK:
+        if CONNECTIONS_PID != pid:
+            CONNECTIONS.clear()
+            CONNECTIONS_PID = pid
+        if hosts not in CONNECTIONS:
+            CONNECTIONS[hosts] = _make_connection(hosts)
+        return CONNECTIONS[hosts]
+
 
 class Docstore():
 
@@ -22,7 +65,7 @@ class Docstore():
         if connection:
             self.es = connection
         else:
-            self.es = Elasticsearch(hosts, timeout=settings.DOCSTORE_TIMEOUT)
+            self.es = get_connection(hosts)
     
     def index_name(self, model):
         return '{}{}'.format(INDEX_PREFIX, model)
@@ -123,7 +166,7 @@ class Docstore():
             body=query,
         )
 
-    def search(self, doctypes=[], query={}, sort=[], fields=[], from_=0, size=MAX_SIZE):
+    def search(self, doctypes=[], query={}, sort=[], fields=[], from_=0, size=MAX_SIZE, source_includes=[], source_excludes=[]):
         """Executes a query, get a list of zero or more hits.
         
         The "query" arg must be a dict that conforms to the Elasticsearch query DSL.
@@ -135,6 +178,8 @@ class Docstore():
         @param fields: str
         @param from_: int Index of document from which to start results
         @param size: int Number of results to return
+        @param source_includes: list Return only these _source fields (default all)
+        @param source_excludes: list Do not return these _source fields
         @returns raw ElasticSearch query output
         """
         logger.debug(
@@ -160,7 +205,8 @@ class Docstore():
             #sort=sort_cleaned,  # TODO figure out sorting
             from_=from_,
             size=size,
-            #_source_include=fields,  # TODO figure out fields
+            _source_includes=','.join(source_includes) or None,
+            _source_excludes=','.join(source_excludes) or None,
         )
         return results
 
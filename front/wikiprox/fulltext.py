@@ -0,0 +1,255 @@
+"""front.fulltext -- Full-text search of articles, authors and sources
+
+Searches encycarticle, encycauthor and encycsource on our own cluster.
+
+    >>> results = fulltext.search('manzanar riot', models=['article'])
+    >>> results['total']
+    42
+    >>> results['objects'][0]
+    {'model': 'article', 'id': 'Manzanar riot', 'title': 'Manzanar riot',
+     'score': 12.1,
+     'fields': {'title': 'Manzanar riot', ...},
+     'highlights': ['...the <mark>riot</mark> at <mark>Manzanar</mark>...']}
+    >>> more = fulltext.search('manzanar riot', cursor=results['next_cursor'])
+
+Pages are chained with search_after; `next_cursor` is an opaque string
+holding the sort values of the last hit, or None on the last page.
+Results are cached for settings.CACHE_TIMEOUT_SEARCH, keyed to the
+normalized query and the index versions.
+"""
+import base64
+import hashlib
+import html
+import json
+import re
+
+from elasticsearch_dsl import Q, Search
+
+from django.conf import settings
+
+from wikiprox import cachestats
+from wikiprox import docstore
+from wikiprox import keys
+from wikiprox import versions
+
+MODELS = ['article', 'author', 'source']
+
+# analyzed fields searched, with boosts; not every index has every field
+QUERY_FIELDS = [
+    'title^3',
+    'description^2',
+    'caption^2',
+    'caption_extended',
+    'body',
+]
+
+# fields with highlighted snippets
+HIGHLIGHT_FIELDS = ['description', 'body', 'caption', 'caption_extended']
+# Snippets come from the raw source, which for body is HTML.  Matches are
+# marked with these and the snippets stripped of tags before <mark> goes in.
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+# whole tags, and pieces of tags cut off at either end of a snippet
+TAG_PATTERN = re.compile(r'<[^>]*>|^[^<]*?>|<[^>]*$')
+
+# _source fields that may be returned, by model
+SOURCE_FIELDS = {
+    'article': ['url_title', 'title', 'title_sort', 'description', 'modified'],
+    'author': ['url_title', 'title', 'title_sort', 'modified'],
+    'source': [
+        'encyclopedia_id', 'headword', 'caption', 'media_format',
+        'img_path', 'modified',
+    ],
+}
+
+# URL names for results, by model; all take the document ID
+URL_NAMES = {
+    'article': 'wikiprox-page',
+    'author': 'wikiprox-author',
+    'source': 'wikiprox-source',
+}
+API_URL_NAMES = {
+    'article': 'wikiprox-api-page',
+    'author': 'wikiprox-api-author',
+    'source': 'wikiprox-api-source',
+}
+
+# types of the sort values in a cursor: _score, _index, url_title,
+# encyclopedia_id (see _search)
+CURSOR_TYPES = [(int, float), str, str, str]
+
+DEFAULT_SIZE = 20
+MAX_SIZE = 100
+
+
+def normalize_query(text):
+    """Lowercase and collapse whitespace so equivalent queries share a cache key
+
+    @param text: str
+    @returns: str
+    """
+    return ' '.join(text.split()).lower()
+
+def encode_cursor(sort_values):
+    """
+    @param sort_values: list
+    @returns: str
+    """
+    return base64.urlsafe_b64encode(
+        json.dumps(sort_values).encode('utf-8')
+    ).decode('ascii')
+
+def decode_cursor(cursor):
+    """
+    @param cursor: str
+    @returns: list
+    @raises: ValueError if the cursor is not one from encode_cursor
+    """
+    try:
+        sort_values = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        )
+    except (TypeError, UnicodeError, json.JSONDecodeError, base64.binascii.Error):
+        raise ValueError('Invalid cursor')
+    # Elasticsearch rejects search_after values that do not match the sort
+    if not (isinstance(sort_values, list)
+            and len(sort_values) == len(CURSOR_TYPES)):
+        raise ValueError('Invalid cursor')
+    for value,types in zip(sort_values, CURSOR_TYPES):
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ValueError('Invalid cursor')
+    return sort_values
+
+def clean_snippet(fragment):
+    """HTML-safe snippet without markup, matches in <mark> tags
+
+    >>> clean_snippet('class="encyc">\ue000Manzanar\ue001</a> &amp; <a href="/To')
+    '<mark>Manzanar</mark> &amp;'
+
+    @param fragment: str Highlighter fragment marked with MARK_START/END
+    @returns: str
+    """
+    text = html.unescape(TAG_PATTERN.sub(' ', fragment))
+    text = ' '.join(html.escape(text, quote=False).split())
+    return text.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+def _model(index):
+    return index.replace(docstore.INDEX_PREFIX, '', 1)
+
+def _fields(models, fields):
+    """_source includes for models, limited to fields if given
+
+    @raises: ValueError if any of fields is not in SOURCE_FIELDS for models
+    """
+    allowed = []
+    for model in models:
+        for field in SOURCE_FIELDS[model]:
+            if field not in allowed:
+                allowed.append(field)
+    if not fields:
+        return allowed
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError('Unknown fields: %s' % ','.join(unknown))
+    return [field for field in allowed if field in fields]
+
+def _search(query, models, sort_values, size, fields):
+    ds = docstore.Docstore()
+    s = Search(
+        using=ds.es,
+        index=[ds.index_name(model) for model in models],
+    )
+    s = s.query(
+        'simple_query_string',
+        query=query,
+        fields=QUERY_FIELDS,
+        default_operator='AND',
+        lenient=True,
+    )
+    # filter out ResourceGuide items but not authors or sources
+    s = s.filter(Q('bool', minimum_should_match=1, should=[
+        Q('term', published_encyc=True),
+        Q('bool', must_not=Q('term', _index=ds.index_name('article'))),
+    ]))
+    s = s.source(includes=fields)
+    s = s.highlight(
+        *HIGHLIGHT_FIELDS,
+        fragment_size=settings.SEARCH_FRAGMENT_SIZE,
+        number_of_fragments=settings.SEARCH_FRAGMENTS,
+    )
+    s = s.highlight_options(pre_tags=[MARK_START], post_tags=[MARK_END])
+    # url_title and encyclopedia_id are the IDs, each in its own indexes
+    s = s.sort(
+        {'_score': 'desc'},
+        {'_index': 'asc'},
+        {'url_title': {'order': 'asc', 'missing': '', 'unmapped_type': 'keyword'}},
+        {'encyclopedia_id': {'order': 'asc', 'missing': '', 'unmapped_type': 'keyword'}},
+    )
+    s = s.extra(size=size, track_total_hits=True)
+    if sort_values:
+        s = s.extra(search_after=sort_values)
+    response = s.execute()
+
+    objects = []
+    for hit in response:
+        highlights = []
+        if hasattr(hit.meta, 'highlight'):
+            for field in HIGHLIGHT_FIELDS:
+                for fragment in getattr(hit.meta.highlight, field, []):
+                    snippet = clean_snippet(fragment)
+                    # matches inside tags leave nothing to show
+                    if '<mark>' in snippet:
+                        highlights.append(snippet)
+        fields = hit.to_dict()
+        objects.append({
+            'model': _model(hit.meta.index),
+            'id': hit.meta.id,
+            'title': fields.get('title') or fields.get('headword') or hit.meta.id,
+            'score': hit.meta.score,
+            'fields': fields,
+            'highlights': highlights,
+        })
+    next_cursor = None
+    if len(objects) == size:
+        next_cursor = encode_cursor(list(response.hits[-1].meta.sort))
+    return {
+        'query': query,
+        'total': response.hits.total.value,
+        'objects': objects,
+        'next_cursor': next_cursor,
+    }
+
+def search(query, models=None, cursor=None, size=DEFAULT_SIZE, fields=None):
+    """Search articles, authors and sources
+
+    @param query: str Words to search for; supports "quoted phrases",
+                  -exclusions and | for OR (see ES simple_query_string)
+    @param models: list Some of MODELS (default all)
+    @param cursor: str next_cursor from a previous page
+    @param size: int Results per page (max MAX_SIZE)
+    @param fields: list Limit returned fields to these (see SOURCE_FIELDS)
+    @returns: dict
+    @raises: ValueError if cursor, models or fields are invalid
+    """
+    query = normalize_query(query)
+    models = sorted(set(models or MODELS))
+    for model in models:
+        if model not in MODELS:
+            raise ValueError('Unknown model: %s' % model)
+    sort_values = decode_cursor(cursor) if cursor else None
+    size = max(1, min(int(size), MAX_SIZE))
+    fields = _fields(models, fields)
+
+    digest = hashlib.sha1(
+        json.dumps([query, cursor or '', size, fields]).encode('utf-8')
+    ).hexdigest()
+    key = keys.key(
+        'search',
+        *['%s-%s' % (model, versions.version(model)) for model in models],
+        digest
+    )
+    results = cachestats.get(key)
+    if results is None:
+        results = _search(query, models, sort_values, size, fields)
+        cachestats.set(key, results, settings.CACHE_TIMEOUT_SEARCH)
+    return results
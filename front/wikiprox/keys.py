@@ -0,0 +1,83 @@
+"""front.keys -- Namespaced cache keys with per-family generations
+
+Every cache key belongs to a family ('ddr:termdocs', 'events', 'body',
+...) and includes the family's current generation number.  Bumping the
+generation invalidates every key in the family with one write; the old
+entries are never read again and expire on their own.
+
+    >>> keys.key('ddr:termdocs', 123, 5)
+    'encyc-front:ddr:termdocs:g0:123:5'
+    >>> keys.bump('ddr:termdocs')
+    >>> keys.key('ddr:termdocs', 123, 5)
+    'encyc-front:ddr:termdocs:g1:123:5'
+
+Generations are read from the cache at most every
+settings.CACHE_GENERATION_INTERVAL seconds per process.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from wikiprox import make_cache_key
+
+PREFIX = 'encyc-front'
+
+# family -> (time checked, generation) for this process
+GENERATIONS = {}
+LOCK = threading.Lock()
+
+
+def _generation_key(family):
+    return '%s:generation:%s' % (PREFIX, family)
+
+def generation(family):
+    """Current generation number of a key family
+
+    @param family: str
+    @returns: int
+    """
+    now = time.time()
+    with LOCK:
+        checked,value = GENERATIONS.get(family, (0, None))
+    if now - checked < settings.CACHE_GENERATION_INTERVAL:
+        return value
+    value = cache.get(_generation_key(family)) or 0
+    with LOCK:
+        GENERATIONS[family] = (now, value)
+    return value
+
+def bump(family):
+    """Invalidate all keys in a family
+
+    Other processes see the new generation within
+    settings.CACHE_GENERATION_INTERVAL seconds.
+
+    @param family: str
+    @returns: int New generation
+    """
+    key = _generation_key(family)
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        # no generation yet, so keys are using 0
+        cache.add(key, 0, None)
+        value = cache.incr(key)
+    with LOCK:
+        GENERATIONS[family] = (time.time(), value)
+    return value
+
+def key(family, *parts):
+    """Cache key for parts in a family
+
+    Long keys are hashed, see wikiprox.make_cache_key.
+
+    @param family: str
+    @param parts: str or int
+    @returns: str
+    """
+    return make_cache_key(':'.join(
+        [PREFIX, family, 'g%s' % generation(family)]
+        + [str(part) for part in parts]
+    ))
@@ -0,0 +1,112 @@
+"""front.links -- Rewrite internal links in article bodies
+
+Article bodies come out of MediaWiki with internal links like
+`<a class="encyc" href="/wiki/Some_Title">`.  On this site they
+must point to `/Some_Title/`.
+
+rewrite_encyc_links() makes a single pass over the HTML with the
+standard library HTMLParser and only touches the `href` attributes of
+`a.encyc` tags.  Everything else is passed through unchanged.
+"""
+from html.parser import HTMLParser
+import re
+
+# one attribute in a raw start tag: double-, single-, un-quoted, or no value
+# Values are consumed whole, so `href=` inside another value never matches.
+ATTR_PATTERN = re.compile(
+    r"""(?P<before>\s+(?P<name>[^\s/>"'=]+)\s*=\s*)"""
+    r"""(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<uq>[^\s"'>]+))"""
+    r"""|\s+[^\s/>"'=]+""",
+)
+
+
+def rewrite_href(href):
+    """Remove `/wiki` from URL and append trailing slash
+
+    >>> rewrite_href('/wiki/Ansel_Adams')
+    '/Ansel_Adams/'
+    >>> rewrite_href('/Ansel_Adams/')
+    '/Ansel_Adams/'
+
+    @param href: str
+    @returns: str
+    """
+    href = href.replace('/wiki', '')
+    if not href.endswith('/'):
+        href += '/'
+    return href
+
+def _rewrite_tag(tag):
+    """Rewrite the href attribute in a raw `<a ...>` start tag
+
+    @param tag: str
+    @returns: str
+    """
+    for m in ATTR_PATTERN.finditer(tag, len('<a')):
+        if (m.group('name') or '').lower() != 'href':
+            continue
+        if m.group('dq') is not None:
+            new = '%s"%s"' % (m.group('before'), rewrite_href(m.group('dq')))
+        elif m.group('sq') is not None:
+            new = "%s'%s'" % (m.group('before'), rewrite_href(m.group('sq')))
+        else:
+            new = '%s%s' % (m.group('before'), rewrite_href(m.group('uq')))
+        return tag[:m.start()] + new + tag[m.end():]
+    return tag
+
+
+class LinkRewriter(HTMLParser):
+    """Finds `a.encyc` start tags and records their rewritten versions
+    """
+
+    def __init__(self):
+        super(LinkRewriter, self).__init__(convert_charrefs=False)
+        # (lineno, offset, old, new)
+        self.edits = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        attrs = dict(attrs)
+        if not attrs.get('href'):
+            return
+        if 'encyc' not in (attrs.get('class') or '').split():
+            return
+        old = self.get_starttag_text()
+        new = _rewrite_tag(old)
+        if new != old:
+            lineno,offset = self.getpos()
+            self.edits.append((lineno, offset, old, new))
+
+    handle_startendtag = handle_starttag
+
+
+def rewrite_encyc_links(html):
+    """Rewrite internal links, leaving the rest of the markup untouched
+
+    >>> rewrite_encyc_links('<p><a class="encyc" href="/wiki/Jerome">Jerome</a></p>')
+    '<p><a class="encyc" href="/Jerome/">Jerome</a></p>'
+
+    @param html: str
+    @returns: str
+    """
+    if not html:
+        return html
+    parser = LinkRewriter()
+    parser.feed(html)
+    parser.close()
+    if not parser.edits:
+        return html
+    # HTMLParser reports (lineno, offset) positions; convert to string index
+    line_starts = [0]
+    for line in html.split('\n')[:-1]:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+    chunks = []
+    position = 0
+    for lineno,offset,old,new in parser.edits:
+        start = line_starts[lineno - 1] + offset
+        chunks.append(html[position:start])
+        chunks.append(new)
+        position = start + len(old)
+    chunks.append(html[position:])
+    return ''.join(chunks)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from wikiprox import keys
+
+
+class Command(BaseCommand):
+    help = 'Invalidates all cache keys in the given families (e.g. ddr:termdocs events locations).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'families', nargs='+',
+            help='Key families: ddr:termdocs, events, locations, body, pages, ...'
+        )
+
+    def handle(self, *args, **options):
+        for family in options['families']:
+            self.stdout.write('%s %s' % (family, keys.bump(family)))
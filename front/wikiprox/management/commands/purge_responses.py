@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from front import middleware
+
+
+class Command(BaseCommand):
+    help = 'Purges cached responses for articles or URL paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'titles', nargs='*',
+            help='Article url_titles (page, print, cite, DDR and API URLs).'
+        )
+        parser.add_argument(
+            '-p', '--path', action='append', default=[],
+            help='URL path to purge; may be repeated.'
+        )
+        parser.add_argument(
+            '-l', '--lists', action='store_true',
+            help='Also purge index, contents, categories and authors.'
+        )
+
+    def handle(self, *args, **options):
+        paths = []
+        for url_title in options['titles']:
+            paths += middleware.purge_article(url_title)
+        for path in options['path']:
+            middleware.purge_path(path)
+            paths.append(path)
+        if options['lists']:
+            paths += middleware.purge_lists()
+        for path in paths:
+            self.stdout.write(path)
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wikiprox import keys
+from wikiprox import models
+
+# cache families built from Elasticsearch directly
+ROOTS = [
+    ('pages', models.Page.pages),
+    ('authors', models.Author.authors),
+    ('sources', models.Source.sources),
+    ('topics_by_url', models.FacetTerm.topics_by_url),
+    ('modified:source', partial(models.modified_index, 'source')),
+]
+# cache families derived from the roots
+DERIVED = [
+    ('pages_by_category', models.Page.pages_by_category),
+    ('pages_by_initial', models.Page.pages_by_initial),
+    ('page-titles', models.Page.titles),
+    (models.PREV_NEXT_KEY, models.Page.prev_next_index),
+    (models.PAGES_BY_AUTHOR_KEY, models.Page.pages_by_author),
+    (models.PAGES_BY_TOPIC_KEY, models.Page.pages_by_topic),
+    ('title_index', models.title_index),
+    ('modified:page', partial(models.modified_index, 'page')),
+    ('modified:author', partial(models.modified_index, 'author')),
+]
+
+
+def _timed(name, function, *args):
+    start = time.time()
+    error = None
+    try:
+        function(*args)
+    except Exception as err:
+        error = err
+    return name, time.time() - start, error
+
+def _prepare_body(url_title):
+    """Get a Page, preparing and caching its body
+    """
+    if not models.Page.get(url_title):
+        raise models.NotFoundError(404, 'not_found', {'_id': url_title})
+
+
+class Command(BaseCommand):
+    help = 'Builds list caches and prepared article bodies, reporting timings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-p', '--parallel', type=int, default=1,
+            help='Number of caches to build at once.'
+        )
+        parser.add_argument(
+            '-b', '--bodies', type=int, default=0,
+            help='Prepare bodies of the N most recently modified articles.'
+        )
+        parser.add_argument(
+            '-a', '--all-bodies', action='store_true',
+            help='Prepare bodies of all articles.'
+        )
+        parser.add_argument(
+            '-f', '--force', action='store_true',
+            help='Invalidate the families (and bodies, if any) first so '
+                 'everything is rebuilt and cold timings are reported.'
+        )
+
+    def _run(self, tasks, parallel):
+        """Run (name, function, args) tasks
+        
+        @returns: ({name: seconds}, {name: exception})
+        """
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = [
+                executor.submit(_timed, name, function, *args)
+                for name,function,args in tasks
+            ]
+            timings = {}
+            errors = {}
+            for future in futures:
+                name,seconds,error = future.result()
+                timings[name] = seconds
+                if error:
+                    errors[name] = error
+            return timings, errors
+
+    def _report(self, name, seconds):
+        self.stdout.write('%-20s %8.3fs' % (name, seconds))
+
+    def handle(self, *args, **options):
+        parallel = options['parallel']
+        if parallel < 1:
+            raise CommandError('--parallel must be at least 1')
+        start = time.time()
+
+        if options['force']:
+            families = [name for name,function in ROOTS + DERIVED]
+            if options['bodies'] or options['all_bodies']:
+                families.append('body')
+            for family in families:
+                keys.bump(family)
+            self.stdout.write('invalidated %s' % ' '.join(families))
+
+        # roots first, derived families then read them from the cache
+        for tasks in [ROOTS, DERIVED]:
+            timings,errors = self._run(
+                [(name, function, []) for name,function in tasks], parallel
+            )
+            for name,function in tasks:
+                self._report(name, timings[name])
+            if errors:
+                raise CommandError('; '.join(
+                    '%s: %s' % (name, err) for name,err in errors.items()
+                ))
+
+        pages = sorted(
+            models.Page.pages(),
+            key=lambda page: page.modified or '',
+            reverse=True
+        )
+        if not options['all_bodies']:
+            pages = pages[:options['bodies']]
+        if pages:
+            bodies_start = time.time()
+            timings,errors = self._run(
+                [
+                    (page.url_title, _prepare_body, [page.url_title])
+                    for page in pages
+                ],
+                parallel
+            )
+            self._report('bodies (%s)' % len(pages), time.time() - bodies_start)
+            if errors:
+                # e.g. unpublished since the list was built
+                self.stdout.write('  failed (%s)' % len(errors))
+                for name,err in sorted(errors.items()):
+                    self.stdout.write('    %s: %s' % (name, err))
+            prepared = [name for name in timings if name not in errors]
+            if prepared:
+                slowest = max(prepared, key=timings.get)
+                self._report('  slowest', timings[slowest])
+                self.stdout.write('    %s' % slowest)
+
+        self._report('total', time.time() - start)
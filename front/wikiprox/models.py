@@ -1,11 +1,11 @@
 from collections import OrderedDict
+from copy import deepcopy
 from datetime import datetime
 import json
 import logging
 logger = logging.getLogger(__name__)
 import os
 
-from bs4 import BeautifulSoup
 import requests
 
 from elasticsearch.exceptions import NotFoundError
@@ -16,15 +16,29 @@ from django.core.cache import cache
 from django.db import models
 from django.urls import reverse
 
+from wikiprox import caching
+from wikiprox import cachestats
 from wikiprox import citations
 from wikiprox import ddr
 from wikiprox import docstore
+from wikiprox import keys
+from wikiprox import links
+from wikiprox import records
 from wikiprox import repo_models
 from wikiprox import search
 from wikiprox import sources
+from wikiprox import versions
 
 MAX_SIZE = 10000
 
+PREV_NEXT_KEY = 'prev_next'
+PAGES_BY_AUTHOR_KEY = 'pages_by_author'
+PAGES_BY_TOPIC_KEY = 'pages_by_topic'
+
+# kinds of object returned by resolve_title
+TITLE_PAGE = 'page'
+TITLE_AUTHOR = 'author'
+
 
 def columnizer(things, cols):
     columns = []
@@ -38,6 +52,121 @@ def columnizer(things, cols):
     columns.append(col)
     return columns
 
+def normalize_title(text):
+    """Normalize a title from a URL for matching
+    
+    >>> normalize_title('Informants_/_"inu"/')
+    'informants / "inu"'
+    
+    @param text: str
+    @returns: str
+    """
+    text = text.replace('_', ' ').strip().rstrip('/')
+    return ' '.join(text.split()).lower()
+
+def title_index():
+    """Dict of normalized Page and Author titles to (kind, id)
+    
+    Built from the Page.pages() and Author.authors() caches.
+    Pages take precedence over Authors with the same title.
+    
+    @returns: dict
+    """
+    KEY = versions.key('title_index', 'article', 'author')
+    data = caching.get(KEY)
+    if not data:
+        data = {}
+        for page in Page.pages():
+            for title in [page.url_title, page.title]:
+                data.setdefault(normalize_title(title), (TITLE_PAGE, page.url_title))
+        for author in Author.authors():
+            for title in [author.url_title, author.title]:
+                data.setdefault(normalize_title(title), (TITLE_AUTHOR, author.url_title))
+        caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+    return data
+
+def resolve_title(url_title):
+    """Resolves a title from a URL to a Page or an Author
+    
+    Ignores case, underscores vs spaces, and trailing slashes.
+    
+    @param url_title: str
+    @returns: (TITLE_PAGE, url_title), (TITLE_AUTHOR, url_title), or (None, None)
+    """
+    return title_index().get(normalize_title(url_title), (None,None))
+
+# kinds of modified_index() and the index each is built from
+MODIFIED_MODELS = {'page': 'article', 'author': 'author', 'source': 'source'}
+
+def modified_index(kind):
+    """Dict of Page, Author or Source IDs to their `modified` timestamps
+
+    Lets views check HTTP validators without fetching documents.  Pages
+    and Authors come from the light lists, which title_index() needs
+    anyway.  Sources are read with only their ID and `modified` fields
+    rather than building Source.sources().
+
+    >>> modified_index('page')['Manzanar']
+    '2020-06-29T12:34:56'
+
+    @param kind: str 'page', 'author', or 'source'
+    @returns: dict
+    """
+    model = MODIFIED_MODELS[kind]
+    KEY = versions.key('modified:%s' % kind, model)
+    data = caching.get(KEY)
+    if not data:
+        if kind == 'page':
+            data = {page.url_title: page.modified for page in Page.pages()}
+        elif kind == 'author':
+            data = {
+                author.url_title: author.modified
+                for author in Author.authors()
+            }
+        else:
+            searcher = search.Searcher()
+            searcher.prepare(
+                params={},
+                search_models=[docstore.Docstore().index_name(model)],
+                fields_nested=[],
+                source_includes=['encyclopedia_id', 'modified'],
+            )
+            data = {
+                hit.encyclopedia_id: getattr(hit, 'modified', None)
+                for hit in searcher.scan()
+            }
+        caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+    return data
+
+def _get_document(cls, model, document_id):
+    """Get a document by ID, remembering IDs that were not found
+    
+    Misses are cached for settings.CACHE_TIMEOUT_NOTFOUND, keyed to the
+    index version so they are forgotten as soon as something is published.
+    Repeated requests for missing documents then cost one cache lookup.
+    Stats for the 'notfound' family only count negative entries hit or
+    written, not the lookups that precede every successful get.
+    
+    @param cls: Author, Page, or Source
+    @param model: str 'author', 'article', or 'source'
+    @param document_id: str
+    @returns: cls object
+    @raises: NotFoundError
+    """
+    key = keys.key('notfound', model, versions.version(model), document_id)
+    if cache.get(key):
+        cachestats.record_hit(key)
+        raise NotFoundError(404, 'not_found (cached)', {'_id': document_id})
+    ds = docstore.Docstore()
+    try:
+        return super(cls, cls).get(
+            id=document_id, index=ds.index_name(model), using=ds.es
+        )
+    except NotFoundError:
+        cache.set(key, 1, settings.CACHE_TIMEOUT_NOTFOUND)
+        cachestats.record_set(key, 1)
+        raise
+
 def _set_attr(obj, hit, fieldname):
     """Assign a SearchResults Hit value if present
     """
@@ -49,10 +178,30 @@ class Author(repo_models.Author):
 
     @staticmethod
     def get(title):
+        return _get_document(Author, 'author', title)
+
+    @staticmethod
+    def get_many(titles):
+        """Get multiple Authors with a single request.
+        
+        Titles of missing Authors are returned as-is.
+        
+        @param titles: list of Author titles
+        @returns: list of Author objects or str, in the same order as titles
+        """
+        if not titles:
+            return []
         ds = docstore.Docstore()
-        return super(Author, Author).get(
-            title, index=ds.index_name('author'), using=ds.es
-    )
+        try:
+            authors = super(Author, Author).mget(
+                titles, index=ds.index_name('author'), using=ds.es, missing='none'
+            )
+        except NotFoundError:
+            authors = [None for title in titles]
+        return [
+            author or title
+            for title,author in zip(titles, authors)
+        ]
 
     def absolute_url(self):
         return reverse('wikiprox-author', args=([self.title,]))
@@ -62,11 +211,7 @@ class Author(repo_models.Author):
         
         @returns: list
         """
-        return [
-            page
-            for page in Page.pages()
-            if page.url_title in self.article_titles
-        ]
+        return Page.pages_by_author().get(self.url_title, [])
 
     @staticmethod
     def authors():
@@ -74,50 +219,39 @@ class Author(repo_models.Author):
         
         @returns: list
         """
-        KEY = 'encyc-front:authors'
-        data = cache.get(KEY)
+        KEY = versions.key('authors', 'author')
+        data = caching.get(KEY)
         if not data:
             searcher = search.Searcher()
             searcher.prepare(
                 params={},
                 search_models=[docstore.Docstore().index_name('author')],
                 fields_nested=[],
-                fields_agg={},
+                source_includes=records.AuthorRecord.__slots__,
             )
             data = sorted([
                 Author.from_hit(hit)
-                for hit in searcher.execute(docstore.MAX_SIZE, 0).objects
+                for hit in searcher.scan()
             ])
-            cache.set(KEY, data, settings.CACHE_TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
         return data
 
     @staticmethod
     def from_hit(hit):
-        """Creates an Author object from a elasticsearch_dsl.response.hit.Hit.
+        """Creates a light Author record from a elasticsearch_dsl.response.hit.Hit.
+        
+        @returns: records.AuthorRecord
         """
-        obj = Author(
-            meta={'id': hit.url_title}
-        )
-        _set_attr(obj, hit, 'url_title')
-        _set_attr(obj, hit, 'public')
-        _set_attr(obj, hit, 'published')
-        _set_attr(obj, hit, 'modified')
-        _set_attr(obj, hit, 'mw_api_url')
-        _set_attr(obj, hit, 'title_sort')
-        _set_attr(obj, hit, 'title')
-        _set_attr(obj, hit, 'body')
-        _set_attr(obj, hit, 'article_titles')
-        return obj
+        return records.AuthorRecord.from_hit(hit)
 
 
 class Page(repo_models.Page):
+    # Sources for this Page, loaded once per instance (see Page.sources)
+    _sources = None
 
     @staticmethod
     def get(title):
-        ds = docstore.Docstore()
-        page = super(Page, Page).get(
-            id=title, index=ds.index_name('article'), using=ds.es
-        )
+        page = _get_document(Page, 'article', title)
         # filter out ResourceGuide items
         if not page.published_encyc:
             return None
@@ -125,14 +259,32 @@ class Page(repo_models.Page):
         return page
     
     def prepare(self):
-        soup = BeautifulSoup(self.body, 'html.parser')
-        # remove `wiki/` from URL
-        # append trailing slashes to internal links
-        for a in soup.find_all('a', class_='encyc'):
-            a['href'] = a['href'].replace('/wiki', '')
-            if a['href'][-1] != '/':
-                a['href'] += '/'
-        self.body = soup.prettify()
+        """Rewrite internal links in body, using cached body if available
+        
+        Prepared bodies are keyed to url_title and modified so the work
+        is done once per revision of an article.
+        """
+        key = keys.key(
+            'body',
+            self.modified.isoformat() if self.modified else '',
+            self.url_title,
+        )
+        body = cachestats.get(key)
+        if body is None:
+            body = Page.prepare_body(self.body)
+            cachestats.set(key, body, settings.CACHE_TIMEOUT_BODY)
+        self.body = body
+    
+    @staticmethod
+    def prepare_body(body):
+        """Rewrite internal links in article body HTML
+        
+        See wikiprox.links.
+        
+        @param body: str
+        @returns: str
+        """
+        return links.rewrite_encyc_links(body)
     
     def absolute_url(self):
         return reverse('wikiprox-page', args=([self.title]))
@@ -142,14 +294,7 @@ class Page(repo_models.Page):
         
         @returns: list
         """
-        objects = []
-        for url_title in self.authors_data['display']:
-            try:
-                author = Author.get(url_title)
-            except NotFoundError:
-                author = url_title
-            objects.append(author)
-        return objects
+        return Author.get_many(self.authors_data['display'])
     
     @staticmethod
     def pages():
@@ -157,8 +302,8 @@ class Page(repo_models.Page):
         
         @returns: list
         """
-        KEY = 'encyc-front:pages'
-        data = cache.get(KEY)
+        KEY = versions.key('pages', 'article')
+        data = caching.get(KEY)
         if not data:
             params={
                 # filter out ResourceGuide items
@@ -169,38 +314,41 @@ class Page(repo_models.Page):
                 params=params,
                 search_models=[docstore.Docstore().index_name('article')],
                 fields_nested=[],
-                fields_agg={},
+                source_includes=records.PageRecord.__slots__,
             )
             data = sorted([
                 Page.from_hit(hit)
-                for hit in searcher.execute(docstore.MAX_SIZE, 0).objects
+                for hit in searcher.scan()
             ])
-            cache.set(KEY, data, settings.CACHE_TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+            # indexes derived from the page list are rebuilt along with it
+            for key,index in Page._page_indexes(data).items():
+                caching.set(key, index, settings.CACHE_TIMEOUT_VERSIONED)
         return data
     
+    @staticmethod
+    def _page_indexes(pages):
+        """Indexes derived from the list of light Pages, keyed to cache keys
+        
+        @param pages: list of light Page objects, sorted
+        @returns: dict
+        """
+        return {
+            versions.key(PREV_NEXT_KEY, 'article'):
+                Page._prev_next_index(pages),
+            versions.key(PAGES_BY_AUTHOR_KEY, 'article'):
+                Page._pages_by_author(pages),
+            versions.key(PAGES_BY_TOPIC_KEY, 'article', 'facetterm'):
+                Page._pages_by_topic(pages),
+        }
+    
     @staticmethod
     def from_hit(hit):
-        """Creates a Page object from a elasticsearch_dsl.response.hit.Hit.
+        """Creates a light Page record from a elasticsearch_dsl.response.hit.Hit.
+        
+        @returns: records.PageRecord
         """
-        obj = Page(
-            meta={'id': hit.url_title}
-        )
-        _set_attr(obj, hit, 'url_title')
-        _set_attr(obj, hit, 'public')
-        _set_attr(obj, hit, 'published')
-        _set_attr(obj, hit, 'published_encyc')
-        _set_attr(obj, hit, 'published_rg')
-        _set_attr(obj, hit, 'modified')
-        _set_attr(obj, hit, 'mw_api_url')
-        _set_attr(obj, hit, 'title_sort')
-        _set_attr(obj, hit, 'title')
-        _set_attr(obj, hit, 'description')
-        #_set_attr(obj, hit, 'body')
-        _set_attr(obj, hit, 'authors_data')
-        _set_attr(obj, hit, 'categories')
-        _set_attr(obj, hit, 'coordinates')
-        _set_attr(obj, hit, 'source_ids')
-        return obj
+        return records.PageRecord.from_hit(hit)
     
     @staticmethod
     def pages_by_category():
@@ -208,8 +356,8 @@ class Page(repo_models.Page):
         
         @returns: list
         """
-        KEY = 'encyc-front:pages_by_category'
-        data = cache.get(KEY)
+        KEY = versions.key('pages_by_category', 'article')
+        data = caching.get(KEY)
         if not data:
             categories = {}
             for page in Page.pages():
@@ -239,13 +387,13 @@ class Page(repo_models.Page):
                     for page in pages
                 ]
                 data.append((key,pages_new))
-            cache.set(KEY, data, settings.CACHE_TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
         return data
 
     @staticmethod
     def pages_by_initial():
-        KEY = 'encyc-front:pages_by_initial'
-        data = cache.get(KEY)
+        KEY = versions.key('pages_by_initial', 'article')
+        data = caching.get(KEY)
         if not data:
             data = OrderedDict()
             data['1-10'] = []
@@ -266,7 +414,7 @@ class Page(repo_models.Page):
                 data[initial] = sorted(
                     pages, key=lambda page: page['title_sort']
                 )
-            cache.set(KEY, data, settings.CACHE_TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
         return data
 
     @staticmethod
@@ -275,11 +423,105 @@ class Page(repo_models.Page):
         
         @returns: list
         """
-        KEY = 'encyc-front:page-titles'
-        data = cache.get(KEY)
+        KEY = versions.key('page-titles', 'article')
+        data = caching.get(KEY)
         if not data:
             data = [page.title for page in Page.pages()]
-            cache.set(KEY, data, settings.CACHE_TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+        return data
+    
+    @staticmethod
+    def prev_next_index():
+        """Dict of Page titles to (previous title, next title)
+        
+        Built alongside Page.pages().
+        
+        @returns: dict
+        """
+        KEY = versions.key(PREV_NEXT_KEY, 'article')
+        data = caching.get(KEY)
+        if not data:
+            data = Page._prev_next_index(Page.pages())
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+        return data
+    
+    @staticmethod
+    def _prev_next_index(pages):
+        """
+        @param pages: list of light Page objects, sorted
+        @returns: dict
+        """
+        titles = [page.title for page in pages]
+        last = len(titles) - 1
+        return {
+            title: (
+                titles[n-1] if n > 0 else None,
+                titles[n+1] if n < last else None,
+            )
+            for n,title in enumerate(titles)
+        }
+    
+    @staticmethod
+    def pages_by_author():
+        """Dict of Author url_titles to lists of light Pages
+        
+        Built alongside Page.pages().
+        
+        @returns: dict
+        """
+        KEY = versions.key(PAGES_BY_AUTHOR_KEY, 'article')
+        data = caching.get(KEY)
+        if data is None:
+            data = Page._pages_by_author(Page.pages())
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+        return data
+    
+    @staticmethod
+    def _pages_by_author(pages):
+        """
+        @param pages: list of light Page objects, sorted
+        @returns: dict
+        """
+        data = {}
+        for page in pages:
+            authors_data = getattr(page, 'authors_data', None)
+            if not authors_data:
+                continue
+            for url_title in authors_data['display']:
+                data.setdefault(url_title, []).append(page)
+        return data
+    
+    @staticmethod
+    def pages_by_topic():
+        """Dict of topic FacetTerm IDs to lists of light Pages
+        
+        Built alongside Page.pages().
+        
+        @returns: dict
+        """
+        KEY = versions.key(PAGES_BY_TOPIC_KEY, 'article', 'facetterm')
+        data = caching.get(KEY)
+        if data is None:
+            data = Page._pages_by_topic(Page.pages())
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
+        return data
+    
+    @staticmethod
+    def _pages_by_topic(pages):
+        """
+        @param pages: list of light Page objects, sorted
+        @returns: dict
+        """
+        pages_by_title = {page.title: page for page in pages}
+        data = {}
+        for title,terms in FacetTerm.topics_by_url().items():
+            page = pages_by_title.get(title)
+            if not page:
+                continue
+            for term in terms:
+                data.setdefault(term.id, []).append(page)
+        for pages in data.values():
+            pages.sort()
         return data
     
     def sources(self):
@@ -287,10 +529,9 @@ class Page(repo_models.Page):
         
         @returns: list
         """
-        try:
-            return [Source.get(sid) for sid in self.source_ids]
-        except NotFoundError:
-            return []
+        if self._sources is None:
+            self._sources = Source.get_many(self.source_ids)
+        return self._sources
     
     def topics(self):
         """List of DDR topics associated with this page.
@@ -300,6 +541,8 @@ class Page(repo_models.Page):
         # return list of dicts rather than an Elasticsearch results object
         terms = []
         for term in FacetTerm.topics_by_url().get(self.title, []):
+            # cached terms are shared with other requests
+            term = deepcopy(term)
             #term.pop('encyc_urls')
             url = '%s/%s/' % (
                 settings.DDR_TOPICS_BASE,
@@ -336,33 +579,46 @@ class Page(repo_models.Page):
         return ddr._balance(objects, size)
 
     def set_prev_next(self):
-        """Sets and previous and next page objects
-        Don't put in Page.get or lists or you'll get three pages for every one
+        """Sets titles of previous and next pages
+        
+        @returns: (prev_page, next_page)
         """
-        # previous,next pages
-        titles = Page.titles()
-        page_index = None
-        for n,title in enumerate(titles):
-            if title == self.title:
-                page_index = n
-        try:
-            self.prev_page = Page.get(titles[page_index-1])
-        except:
-            self.prev_page = None
-        try:
-            self.next_page = Page.get(titles[page_index+1])
-        except:
-            self.next_page = None
+        self.prev_page,self.next_page = Page.prev_next_index().get(
+            self.title, (None,None)
+        )
         return self.prev_page,self.next_page
 
 class Source(repo_models.Source):
 
     @staticmethod
     def get(title):
+        return _get_document(Source, 'source', title)
+    
+    @staticmethod
+    def get_many(encyclopedia_ids):
+        """Get multiple Sources with a single request.
+        
+        Missing Sources are logged and left out of the results.
+        
+        @param encyclopedia_ids: list
+        @returns: list of Source objects, in the same order as encyclopedia_ids
+        """
+        if not encyclopedia_ids:
+            return []
         ds = docstore.Docstore()
-        return super(Source, Source).get(
-            title, index=ds.index_name('source'), using=ds.es
-        )
+        try:
+            sources = super(Source, Source).mget(
+                encyclopedia_ids,
+                index=ds.index_name('source'), using=ds.es, missing='none'
+            )
+        except NotFoundError:
+            sources = [None for sid in encyclopedia_ids]
+        missing = [
+            sid for sid,source in zip(encyclopedia_ids, sources) if not source
+        ]
+        if missing:
+            logger.error('Sources not found: %s' % missing)
+        return [source for source in sources if source]
     
     def absolute_url(self):
         return reverse('wikiprox-source', args=([self.encyclopedia_id]))
@@ -415,65 +671,30 @@ class Source(repo_models.Source):
         
         @returns: list
         """
-        KEY = 'encyc-front:sources'
-        data = cache.get(KEY)
+        KEY = versions.key('sources', 'source')
+        data = caching.get(KEY)
         if not data:
             searcher = search.Searcher()
             searcher.prepare(
                 params={},
                 search_models=[docstore.Docstore().index_name('source')],
                 fields_nested=[],
-                fields_agg={},
+                source_includes=records.SourceRecord.__slots__,
             )
             data = sorted([
                 Source.from_hit(hit)
-                for hit in searcher.execute(docstore.MAX_SIZE, 0).objects
+                for hit in searcher.scan()
             ])
-            cache.set(KEY, data, settings.CACHE_TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
         return data
     
     @staticmethod
     def from_hit(hit):
-        """Creates a Source object from a elasticsearch_dsl.response.hit.Hit.
+        """Creates a light Source record from a elasticsearch_dsl.response.hit.Hit.
+        
+        @returns: records.SourceRecord
         """
-        obj = Source(
-            meta={'id': hit.encyclopedia_id}
-        )
-        _set_attr(obj, hit, 'encyclopedia_id')
-        _set_attr(obj, hit, 'densho_id')
-        _set_attr(obj, hit, 'psms_id')
-        _set_attr(obj, hit, 'psms_api')
-        _set_attr(obj, hit, 'institution_id')
-        _set_attr(obj, hit, 'collection_name')
-        _set_attr(obj, hit, 'created')
-        _set_attr(obj, hit, 'modified')
-        _set_attr(obj, hit, 'published')
-        _set_attr(obj, hit, 'creative_commons')
-        _set_attr(obj, hit, 'headword')
-        _set_attr(obj, hit, 'original')
-        _set_attr(obj, hit, 'original_size')
-        _set_attr(obj, hit, 'original_url')
-        _set_attr(obj, hit, 'original_path')
-        _set_attr(obj, hit, 'original_path_abs')
-        _set_attr(obj, hit, 'display')
-        _set_attr(obj, hit, 'display_size')
-        _set_attr(obj, hit, 'display_url')
-        _set_attr(obj, hit, 'display_path')
-        _set_attr(obj, hit, 'display_path_abs')
-        #_set_attr(obj, hit, 'streaming_path')
-        #_set_attr(obj, hit, 'rtmp_path')
-        _set_attr(obj, hit, 'streaming_url')
-        _set_attr(obj, hit, 'external_url')
-        _set_attr(obj, hit, 'media_format')
-        _set_attr(obj, hit, 'aspect_ratio')
-        _set_attr(obj, hit, 'caption')
-        _set_attr(obj, hit, 'caption_extended')
-        #_set_attr(obj, hit, 'transcript_path')
-        _set_attr(obj, hit, 'transcript')
-        _set_attr(obj, hit, 'courtesy')
-        _set_attr(obj, hit, 'filename')
-        _set_attr(obj, hit, 'img_path')
-        return obj
+        return records.SourceRecord.from_hit(hit)
 
 
 class Citation(object):
@@ -569,18 +790,14 @@ class FacetTerm(repo_models.FacetTerm):
             },
             search_models=[docstore.Docstore().index_name('facetterm')],
             fields_nested=[],
-            fields_agg={},
         )
-        results = searcher.execute(docstore.MAX_SIZE, 0)
-        objects = results.objects
-        data = sorted([FacetTerm.from_hit(hit) for hit in objects])
+        data = sorted([FacetTerm.from_hit(hit) for hit in searcher.scan()])
         return data
     
     @staticmethod
     def topics_by_url():
-        KEY = 'encyc-front:topics_by_url'
-        TIMEOUT = 60*5
-        data = cache.get(KEY)
+        KEY = versions.key('topics_by_url', 'facetterm')
+        data = caching.get(KEY)
         if not data:
             data = {}
             for term in FacetTerm.topics():
@@ -590,7 +807,7 @@ class FacetTerm(repo_models.FacetTerm):
                         if not data.get(title, None):
                             data[title] = []
                         data[title].append(term)
-            cache.set(KEY, data, TIMEOUT)
+            caching.set(KEY, data, settings.CACHE_TIMEOUT_VERSIONED)
         return data
 
     def articles(self):
@@ -598,8 +815,4 @@ class FacetTerm(repo_models.FacetTerm):
         
         @returns: list
         """
-        return [
-            page
-            for page in Page.pages()
-            if page.url_title in self.article_titles
-        ]
+        return Page.pages_by_topic().get(self.id, [])
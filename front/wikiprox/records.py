@@ -0,0 +1,192 @@
+"""front.records -- Compact records for cached listings
+
+Page.pages(), Author.authors() and Source.sources() cache thousands of
+"light" objects.  Full elasticsearch_dsl Documents carry an AttrDict,
+meta, and their field names with every instance, which makes them slow
+to unpickle and large in Redis and in worker memory.
+
+Records have fixed __slots__ and pickle as a tuple of plain values.
+They implement only what the listings use: the fields, sorting,
+and absolute_url().  List builders fetch only the __slots__ fields
+from Elasticsearch.
+"""
+from sys import intern
+
+from elasticsearch_dsl.utils import AttrDict, AttrList
+
+from django.urls import reverse
+
+
+def _plain(value):
+    """Convert elasticsearch_dsl wrappers to plain lists and dicts
+    
+    Strings inside lists (categories, author names, etc) are interned
+    so that repeated values are stored once in memory and in pickles.
+    """
+    if isinstance(value, (AttrList, list)):
+        return [
+            intern(v) if isinstance(v, str) else _plain(v)
+            for v in value
+        ]
+    if isinstance(value, AttrDict):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {key: _plain(val) for key,val in value.items()}
+    return value
+
+
+class Record(object):
+    """Base class: subclasses list their fields in __slots__
+    """
+    __slots__ = ()
+    # fields that default to an empty list
+    LIST_FIELDS = ()
+    # field used for equality and sorting
+    SORT_FIELD = None
+
+    def __init__(self, *args, **kwargs):
+        for name,value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name in self.__slots__[len(args):]:
+            if name in kwargs:
+                setattr(self, name, kwargs[name])
+            elif name in self.LIST_FIELDS:
+                setattr(self, name, [])
+            else:
+                setattr(self, name, None)
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            tuple(getattr(self, name) for name in self.__slots__)
+        )
+
+    def __repr__(self):
+        return '<%s.%s "%s">' % (
+            self.__module__,
+            self.__class__.__name__,
+            getattr(self, self.__slots__[0])
+        )
+
+    def __eq__(self, other):
+        """Enable Pythonic sorting"""
+        if type(other) is not type(self):
+            return NotImplemented
+        return getattr(self, self.SORT_FIELD) == getattr(other, self.SORT_FIELD)
+
+    def __hash__(self):
+        """Consistent with __eq__ so records can go in sets and dict keys"""
+        return hash((type(self), getattr(self, self.SORT_FIELD)))
+
+    def __lt__(self, other):
+        """Enable Pythonic sorting"""
+        if type(other) is not type(self):
+            return NotImplemented
+        return getattr(self, self.SORT_FIELD) < getattr(other, self.SORT_FIELD)
+
+    @classmethod
+    def from_hit(cls, hit):
+        """Creates a record from a elasticsearch_dsl.response.hit.Hit.
+        """
+        return cls(**{
+            name: _plain(getattr(hit, name))
+            for name in cls.__slots__
+            if hasattr(hit, name)
+        })
+
+
+class PageRecord(Record):
+    """Light version of models.Page
+    """
+    __slots__ = (
+        'url_title',
+        'public',
+        'published',
+        'published_encyc',
+        'published_rg',
+        'modified',
+        'mw_api_url',
+        'title_sort',
+        'title',
+        'description',
+        'authors_data',
+        'categories',
+        'coordinates',
+        'source_ids',
+    )
+    LIST_FIELDS = ('categories', 'coordinates', 'source_ids')
+    SORT_FIELD = 'title_sort'
+
+    def __str__(self):
+        return self.title
+
+    def absolute_url(self):
+        return reverse('wikiprox-page', args=([self.title]))
+
+
+class AuthorRecord(Record):
+    """Light version of models.Author
+    """
+    __slots__ = (
+        'url_title',
+        'public',
+        'published',
+        'modified',
+        'mw_api_url',
+        'title_sort',
+        'title',
+        'article_titles',
+    )
+    LIST_FIELDS = ('article_titles',)
+    SORT_FIELD = 'title_sort'
+
+    def __str__(self):
+        return self.title
+
+    def absolute_url(self):
+        return reverse('wikiprox-author', args=([self.title,]))
+
+
+class SourceRecord(Record):
+    """Light version of models.Source
+    """
+    __slots__ = (
+        'encyclopedia_id',
+        'densho_id',
+        'psms_id',
+        'psms_api',
+        'institution_id',
+        'collection_name',
+        'created',
+        'modified',
+        'published',
+        'creative_commons',
+        'headword',
+        'original',
+        'original_size',
+        'original_url',
+        'original_path',
+        'original_path_abs',
+        'display',
+        'display_size',
+        'display_url',
+        'display_path',
+        'display_path_abs',
+        'streaming_url',
+        'external_url',
+        'media_format',
+        'aspect_ratio',
+        'caption',
+        'caption_extended',
+        'transcript',
+        'courtesy',
+        'filename',
+        'img_path',
+    )
+    SORT_FIELD = 'encyclopedia_id'
+
+    def __str__(self):
+        return self.encyclopedia_id
+
+    def absolute_url(self):
+        return reverse('wikiprox-source', args=([self.encyclopedia_id]))
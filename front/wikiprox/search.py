@@ -1,5 +1,6 @@
 from collections import OrderedDict
 from copy import deepcopy
+import hashlib
 import json
 import logging
 logger = logging.getLogger(__name__)
@@ -8,10 +9,14 @@ import re
 
 from elasticsearch_dsl import Search
 from elasticsearch_dsl.query import QueryString
+from elasticsearch_dsl.utils import AttrList
 
 from django.conf import settings
 
+from . import cachestats
 from . import docstore
+from . import keys
+from . import versions
 
 #SEARCH_LIST_FIELDS = models.all_list_fields()
 DEFAULT_LIMIT = 1000
@@ -399,12 +404,13 @@ class Searcher(object):
     >>> d = r.to_dict(request)
     """
     
-    def __init__(self, conn=docstore.Docstore().es, search=None):
+    def __init__(self, conn=None, search=None):
         """
         @param conn: elasticsearch.Elasticsearch with hosts/port
+                     (default docstore.get_connection())
         @param index: str Elasticsearch index name
         """
-        self.conn = conn
+        self.conn = conn or docstore.get_connection()
         self.s = search
         fields = []
         params = {}
@@ -416,15 +422,17 @@ class Searcher(object):
             es_host_name(self.conn), self.params
         )
 
-    def prepare(self, params={}, params_whitelist=SEARCH_PARAM_WHITELIST, search_models=SEARCH_MODELS, fields=SEARCH_INCLUDE_FIELDS, fields_nested=SEARCH_NESTED_FIELDS, fields_agg=SEARCH_AGG_FIELDS):
+    def prepare(self, params={}, params_whitelist=SEARCH_PARAM_WHITELIST, search_models=SEARCH_MODELS, fields=SEARCH_INCLUDE_FIELDS, fields_nested=SEARCH_NESTED_FIELDS, fields_agg={}, source_includes=[], source_excludes=[]):
         """Assemble elasticsearch_dsl.Search object
         
         @param params:           dict
         @param params_whitelist: list Accept only these (SEARCH_PARAM_WHITELIST)
         @param search_models:    list Limit to these ES doctypes (SEARCH_MODELS)
-        @param fields:           list Retrieve these fields (SEARCH_INCLUDE_FIELDS)
+        @param fields:           list Fulltext search these fields (SEARCH_INCLUDE_FIELDS)
         @param fields_nested:    list See SEARCH_NESTED_FIELDS
-        @param fields_agg:       dict See SEARCH_AGG_FIELDS
+        @param fields_agg:       dict Aggregations to compute, e.g. SEARCH_AGG_FIELDS (default none)
+        @param source_includes:  list Return only these _source fields (default all)
+        @param source_excludes:  list Do not return these _source fields
         @returns: 
         """
 
@@ -455,6 +463,11 @@ class Searcher(object):
         
         s = Search(using=self.conn, index=indices)
         
+        if source_includes or source_excludes:
+            s = s.source(
+                includes=list(source_includes), excludes=list(source_excludes)
+            )
+        
         # filter out ResourceGuide items
         if 'encycarticle' in indices:
             s = s.filter('term', published_encyc=True)
@@ -555,16 +568,87 @@ class Searcher(object):
         if not self.s:
             raise Exception('Searcher has no ES Search object.')
         start,stop = start_stop(limit, offset)
-        response = self.s[start:stop].execute()
+        s = self.s
+        aggs_key = None
+        aggregations = None
+        if s.aggs.to_dict():
+            # aggregations are the same for every page of a query
+            aggs_key = self._aggs_key()
+            aggregations = cachestats.get(aggs_key)
+            if aggregations is not None:
+                s = s.extra(aggs={})
+        response = s[start:stop].execute()
         for n,hit in enumerate(response.hits):
             hit.index = '%s %s/%s' % (n, int(offset)+n, response.hits.total)
-        return SearchResults(
+        results = SearchResults(
             params=self.params,
             query=self.s.to_dict(),
             results=response,
             limit=limit,
             offset=offset,
         )
+        if aggregations is not None:
+            results.aggregations = {
+                field: AttrList(buckets)
+                for field,buckets in aggregations.items()
+            }
+        elif aggs_key and (results.aggregations is not None):
+            cachestats.set(
+                aggs_key,
+                {
+                    field: [bucket.to_dict() for bucket in buckets]
+                    for field,buckets in results.aggregations.items()
+                },
+                settings.CACHE_TIMEOUT_AGGS
+            )
+        return results
+    
+    def _aggs_key(self):
+        """Cache key for this query's aggregations
+        
+        Derived from the query and filters (not paging, sorting or fields)
+        and the versions of the indexes searched.
+        """
+        query = self.s.to_dict()
+        for name in ['aggs', 'from', 'size', 'sort', '_source', 'highlight']:
+            query.pop(name, None)
+        indices = self.s._index or []
+        if isinstance(indices, str):
+            indices = indices.split(',')
+        index_versions = []
+        for index in sorted(indices):
+            model = index.replace(docstore.INDEX_PREFIX, '', 1)
+            if model in versions.MODELS:
+                index_versions.append('%s-%s' % (model, versions.version(model)))
+            else:
+                index_versions.append(index)
+        digest = hashlib.sha1(json.dumps(
+            [query, self.s.aggs.to_dict()], sort_keys=True
+        ).encode('utf-8')).hexdigest()
+        return keys.key('aggs', *(index_versions + [digest]))
+    
+    def scan(self, batch_size=None):
+        """Iterate over all hits, fetching batch_size at a time
+        
+        Unlike execute() this is not limited to docstore.MAX_SIZE hits.
+        Uses the scroll API so results come from a consistent snapshot
+        of the index.  Hits are not in any particular order and
+        aggregations are ignored.
+        
+        >>> for hit in searcher.scan():
+        ...     print(hit.title)
+        
+        @param batch_size: int (default settings.DOCSTORE_SCAN_BATCH)
+        @returns: generator of elasticsearch_dsl.response.hit.Hit
+        """
+        if not self.s:
+            raise Exception('Searcher has no ES Search object.')
+        s = self.s.params(
+            size=batch_size or settings.DOCSTORE_SCAN_BATCH,
+            scroll=settings.DOCSTORE_SCROLL,
+        )
+        for hit in s.scan():
+            yield hit
 
 
 def search(hosts, models=[], parent=None, filters=[], fulltext='', limit=10000, offset=0, page=None, aggregations=False):
@@ -620,11 +704,14 @@ def search(hosts, models=[], parent=None, filters=[], fulltext='', limit=10000,
         offset = es_offset(limit, thispage)
     
     searcher = Searcher()
-    searcher.prepare(params={
-        'fulltext': fulltext,
-        'models': models,
-        'parent': parent,
-        'filters': filters,
-    })
+    searcher.prepare(
+        params={
+            'fulltext': fulltext,
+            'models': models,
+            'parent': parent,
+            'filters': filters,
+        },
+        fields_agg=SEARCH_AGG_FIELDS if aggregations else {},
+    )
     results = searcher.execute(limit, offset)
     return results
@@ -1,20 +1,19 @@
 from datetime import datetime
 import json
 
-import requests
-
 from django.conf import settings
 from django.core.cache import cache
 from django.template import loader
 from django.urls import reverse
 
 from wikiprox import make_cache_key
+from wikiprox import upstream
 
 
 def source(encyclopedia_id):
     source = None
     url = '%s/primarysource/?encyclopedia_id=%s' % (settings.SOURCES_API, encyclopedia_id)
-    r = requests.get(url, headers={'content-type':'application/json'})
+    r = upstream.get(url, headers={'content-type':'application/json'})
     if r.status_code == 200:
         response = json.loads(r.text)
         if response and (response['meta']['total_count'] == 1):
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 
@@ -98,3 +98,276 @@ class WikiPageTitles(TestCase):
         assert 'Brian Niiya' in content
         assert 'is the content director' in content
         assert '<a href="/A.L.%20Wirin/">A.L. Wirin</a>' in content
+
+
+class LinkRewriter(TestCase):
+    """Test that internal links are rewritten without disturbing markup
+    """
+    
+    def test_rewrite_encyc_links(self):
+        from wikiprox.links import rewrite_encyc_links
+        html = '<p>\n<a class="encyc" href="/wiki/Jerome">Jerome</a>\n' \
+               '<a class="external" href="/wiki/Jerome">Jerome</a>\n' \
+               "<a class='encyc' href='/Tule_Lake/'>Tule Lake</a></p>"
+        expected = '<p>\n<a class="encyc" href="/Jerome/">Jerome</a>\n' \
+                   '<a class="external" href="/wiki/Jerome">Jerome</a>\n' \
+                   "<a class='encyc' href='/Tule_Lake/'>Tule Lake</a></p>"
+        assert rewrite_encyc_links(html) == expected
+    
+    def test_rewrite_encyc_links_attribute_value(self):
+        from wikiprox.links import rewrite_encyc_links
+        html = '<a title="x href=y" class="encyc" href="/wiki/Foo">Foo</a>'
+        expected = '<a title="x href=y" class="encyc" href="/Foo/">Foo</a>'
+        assert rewrite_encyc_links(html) == expected
+    
+    def test_rewrite_encyc_links_sample(self):
+        import re
+        from wikiprox.links import rewrite_encyc_links
+        from wikiprox.sample_data import pagedata_Amache_20120829
+        # internal links as published (see bin/bench-prepare.py)
+        html = re.sub(
+            r'<a href="/mediawiki/index.php/(?!File:)([^"]+)"',
+            r'<a class="encyc" href="/wiki/\1"',
+            pagedata_Amache_20120829['parse']['text']['*']
+        )
+        assert 'class="encyc" href="/wiki/' in html
+        rewritten = rewrite_encyc_links(html)
+        assert 'class="encyc" href="/wiki/' not in rewritten
+        assert rewritten.count('class="encyc" href="/') \
+            == html.count('class="encyc" href="/')
+        # nothing but the hrefs changed
+        assert re.sub(r'href="[^"]*"', '', rewritten) \
+            == re.sub(r'href="[^"]*"', '', html)
+
+
+class TitleResolver(TestCase):
+    
+    def test_normalize_title(self):
+        from wikiprox.models import normalize_title
+        assert normalize_title('Ansel_Adams') == 'ansel adams'
+        assert normalize_title('Ansel Adams/') == 'ansel adams'
+        assert normalize_title('ANSEL  ADAMS') == 'ansel adams'
+        assert normalize_title('Informants / "inu"') == 'informants / "inu"'
+    
+    def test_article_not_found(self):
+        assert self.client.get(
+            reverse('wikiprox-page', args=['wp-login.php'])
+        ).status_code == 404
+    
+    def test_article_canonical_redirect(self):
+        from unittest import mock
+        from wikiprox import models
+        with mock.patch.object(
+                models, 'resolve_title',
+                return_value=(models.TITLE_PAGE, 'Ansel Adams')) as resolve, \
+             mock.patch.object(models, 'modified_index',
+                return_value={'Ansel Adams': '2020-01-01T00:00:00'}):
+            # a validator match for the canonical page is not a 304
+            response = self.client.get('/ansel_adams/', HTTP_IF_NONE_MATCH='*')
+        assert resolve.call_count == 1
+        assert response.status_code == 301
+        assert response['Location'] == reverse(
+            'wikiprox-page', args=['Ansel Adams']
+        )
+
+
+class ResponseCache(TestCase):
+    
+    def test_normalized_query(self):
+        from django.test import RequestFactory
+        from front.middleware import normalized_query
+        request = RequestFactory().get('/Manzanar/?utm_source=x&b=2&fbclid=y&a=1')
+        assert normalized_query(request) == 'a=1&b=2'
+    
+    def test_purge_article(self):
+        from front.middleware import purge_article
+        paths = purge_article('A.L. Wirin')
+        assert '/A.L.%20Wirin/' in paths
+        assert '/A.L.%20Wirin' in paths
+        assert '/api/0.1/articles/A.L.%20Wirin/' in paths
+    
+    def test_list_keys_follow_versions(self):
+        import time
+        from django.test import RequestFactory
+        from django.urls import resolve
+        from front.middleware import ResponseCacheMiddleware
+        from wikiprox import versions
+        middleware = ResponseCacheMiddleware(lambda request: None)
+        def key(article_version):
+            versions.CHECKED = (time.time() + 60, {'article': article_version})
+            request = RequestFactory().get('/contents/')
+            request.resolver_match = resolve('/contents/')
+            middleware.process_view(request, None, [], {})
+            return request._response_cache[0]
+        checked = versions.CHECKED
+        try:
+            with override_settings(CACHES=LOCMEM):
+                assert key('1-1') == key('1-1')
+                assert key('1-1') != key('2-1')
+        finally:
+            versions.CHECKED = checked
+
+
+class CacheKeys(TestCase):
+    
+    def test_make_cache_key(self):
+        from wikiprox import make_cache_key
+        assert make_cache_key('encyc-front:events:g0') == 'encyc-front:events:g0'
+        assert make_cache_key('a b') != make_cache_key('ab')
+        assert make_cache_key('x' * 300) != make_cache_key('x' * 301)
+        assert len(make_cache_key('x' * 300)) <= 200
+    
+    def test_bump(self):
+        from wikiprox import keys
+        before = keys.key('test', 1)
+        keys.bump('test')
+        assert keys.key('test', 1) != before
+
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM, CACHE_LOCK_WAIT=0.3)
+class ListCache(TestCase):
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from wikiprox import caching
+        cache.clear()
+        caching.clear_local()
+    
+    def test_expired_locked_serves_stale(self):
+        from django.core.cache import cache
+        from wikiprox import caching
+        caching.set('test:list', ['stale'], 0)
+        cache.add(caching._lock_key('test:list'), 1, 60)
+        assert caching.get('test:list') == ['stale']
+    
+    def test_expired_unlocked_rebuilds(self):
+        from wikiprox import caching
+        caching.set('test:list', ['stale'], 0)
+        assert caching.get('test:list') is None
+        # this caller now holds the lock, so others get stale data
+        assert caching.get('test:list') == ['stale']
+    
+    def test_missing_locked_waits(self):
+        import time
+        from django.core.cache import cache
+        from wikiprox import caching
+        cache.add(caching._lock_key('test:list'), 1, 60)
+        start = time.time()
+        assert caching.get('test:list') is None
+        assert time.time() - start >= 0.3
+    
+    def test_new_version_locked_serves_previous(self):
+        from django.core.cache import cache
+        from wikiprox import caching
+        caching.set('encyc-front:test:g0:article-1-1', ['old'], 60)
+        cache.add(caching._lock_key('encyc-front:test:g0:article-2-1'), 1, 60)
+        assert caching.get('encyc-front:test:g0:article-2-1') == ['old']
+    
+    def test_set_releases_lock(self):
+        from django.core.cache import cache
+        from wikiprox import caching
+        assert caching.get('test:list') is None
+        assert cache.get(caching._lock_key('test:list'))
+        caching.set('test:list', ['fresh'], 60)
+        assert cache.get(caching._lock_key('test:list')) is None
+        assert caching.get('test:list') == ['fresh']
+
+
+class FulltextSearch(TestCase):
+    
+    def test_normalize_query(self):
+        from wikiprox.fulltext import normalize_query
+        assert normalize_query('  Manzanar\t RIOT ') == 'manzanar riot'
+    
+    def test_cursor(self):
+        from wikiprox.fulltext import encode_cursor, decode_cursor
+        sort_values = [1.5, 'encycarticle', 'A.L. Wirin', '']
+        assert decode_cursor(encode_cursor(sort_values)) == sort_values
+        self.assertRaises(ValueError, decode_cursor, 'not a cursor!')
+        self.assertRaises(ValueError, decode_cursor, encode_cursor({'a': 1}))
+        self.assertRaises(ValueError, decode_cursor, encode_cursor(['x', {}]))
+        self.assertRaises(
+            ValueError, decode_cursor, encode_cursor(['x', 'encycarticle', 'a', ''])
+        )
+    
+    def test_api_bad_cursor(self):
+        from wikiprox.fulltext import encode_cursor
+        response = self.client.get(reverse('wikiprox-api-search'), {
+            'q': 'manzanar', 'cursor': encode_cursor(['x', {}]),
+        })
+        assert response.status_code == 400
+    
+    def test_api_requires_query(self):
+        response = self.client.get(reverse('wikiprox-api-search'))
+        assert response.status_code == 400
+    
+    def test_api_unknown_fields(self):
+        response = self.client.get(
+            reverse('wikiprox-api-search'), {'q': 'manzanar', 'fields': 'body'}
+        )
+        assert response.status_code == 400
+    
+    def test_clean_snippet(self):
+        from wikiprox.fulltext import clean_snippet, MARK_START, MARK_END
+        fragment = 'ss="encyc" href="/Manzanar/">%sManzanar%s</a> riot</p><p>In' % (
+            MARK_START, MARK_END
+        )
+        assert clean_snippet(fragment) == '<mark>Manzanar</mark> riot In'
+
+
+@override_settings(CACHES=LOCMEM)
+class SearchAggregations(TestCase):
+    
+    def test_aggregations_cached(self):
+        import time
+        from unittest import mock
+        import elasticsearch
+        from elasticsearch_dsl import Search
+        from django.core.cache import cache
+        from wikiprox import search, versions
+        cache.clear()
+        requests = []
+        def es_search(self, *args, **kwargs):
+            requests.append(kwargs)
+            return {
+                'took': 1, 'timed_out': False, '_shards': {},
+                'hits': {'total': {'value': 1, 'relation': 'eq'}, 'hits': [
+                    {'_index': 'encycarticle', '_id': 'Manzanar', '_score': 1.0,
+                     '_source': {'title': 'Manzanar'}}
+                ]},
+                'aggregations': {'genre': {'buckets': [
+                    {'key': 'camps', 'doc_count': 3}
+                ]}},
+            }
+        conn = elasticsearch.Elasticsearch()
+        s = Search(using=conn, index='encycarticle').query('match', title='manzanar')
+        s.aggs.bucket('genre', 'terms', field='genre')
+        searcher = search.Searcher(conn=conn, search=s)
+        searcher.params = {}
+        checked = versions.CHECKED
+        versions.CHECKED = (time.time() + 60, {'article': '1-1-1'})
+        try:
+            with mock.patch.object(elasticsearch.Elasticsearch, 'search', es_search):
+                miss = searcher.execute(10, 0)
+                hit = searcher.execute(10, 10)
+        finally:
+            versions.CHECKED = checked
+        # second page reuses the first page's aggregations
+        assert requests[0]['aggs']
+        assert not requests[1].get('aggs')
+        assert [b.key for b in hit.aggregations['genre']] \
+            == [b.key for b in miss.aggregations['genre']] == ['camps']
+
+
+class Records(TestCase):
+    
+    def test_compare(self):
+        from wikiprox.records import PageRecord
+        a = PageRecord(url_title='Manzanar', title_sort='manzanar')
+        b = PageRecord(url_title='Manzanar', title_sort='manzanar')
+        assert a == b
+        assert a != None
+        assert a != 'manzanar'
+        assert len({a, b}) == 1
@@ -0,0 +1,134 @@
+"""front.upstream -- Pooled HTTP client for upstream APIs
+
+All requests to the DDR API and encyc-psms (SOURCES_API) go through
+a single requests.Session per process so that connections are kept
+alive and reused.  Idempotent requests are retried with backoff and
+request times are recorded for each upstream.
+
+    >>> from wikiprox import upstream
+    >>> r = upstream.get('%s/events/' % settings.SOURCES_API, timeout=3)
+    >>> upstream.stats()
+    {'sources': {'requests': 1, 'errors': 0, 'seconds': 0.042}}
+"""
+import logging
+logger = logging.getLogger(__name__)
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
+
+# (pid, requests.Session) so a forked worker does not reuse its parent's sockets
+SESSION = (None, None)
+LOCK = threading.Lock()
+STATS = {}
+
+
+def upstreams():
+    """Names and base URLs of known upstream APIs
+
+    @returns: dict
+    """
+    return {
+        'ddr': settings.DDR_API,
+        'sources': settings.SOURCES_API,
+    }
+
+def upstream_name(url):
+    """Name of the upstream API for a URL, or its host if not known
+
+    @param url: str
+    @returns: str
+    """
+    for name,base in upstreams().items():
+        if base and url.startswith(base):
+            return name
+    return urlparse(url).netloc
+
+def _retry_methods(methods):
+    """Retry() kwarg for retried methods; renamed in urllib3 1.26
+    """
+    if hasattr(Retry, 'DEFAULT_ALLOWED_METHODS'):
+        return {'allowed_methods': methods}
+    return {'method_whitelist': methods}
+
+def _make_session():
+    retry = Retry(
+        total=settings.UPSTREAM_RETRIES,
+        # read timeouts are raised, not retried, so callers still see Timeout
+        read=False,
+        backoff_factor=settings.UPSTREAM_BACKOFF,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+        **_retry_methods(frozenset(['GET', 'HEAD']))
+    )
+    # one adapter, but urllib3 keeps a separate pool of up to
+    # UPSTREAM_POOL_MAXSIZE connections for each host
+    adapter = HTTPAdapter(
+        pool_connections=settings.UPSTREAM_POOL_CONNECTIONS,
+        pool_maxsize=settings.UPSTREAM_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def session():
+    """Returns the requests.Session for this process
+
+    @returns: requests.Session
+    """
+    global SESSION
+    pid = os.getpid()
+    if SESSION[0] != pid:
+        with LOCK:
+            if SESSION[0] != pid:
+                SESSION = (pid, _make_session())
+    return SESSION[1]
+
+def _record(name, elapsed, error):
+    with LOCK:
+        data = STATS.setdefault(name, {'requests': 0, 'errors': 0, 'seconds': 0.0})
+        data['requests'] += 1
+        data['seconds'] += elapsed
+        if error:
+            data['errors'] += 1
+
+def get(url, **kwargs):
+    """HTTP GET using the pooled session
+
+    Takes the same arguments as requests.get.
+    Uses settings.UPSTREAM_TIMEOUT if no timeout is given.
+
+    @param url: str
+    @returns: requests.Response
+    """
+    kwargs.setdefault('timeout', settings.UPSTREAM_TIMEOUT)
+    name = upstream_name(url)
+    start = time.time()
+    try:
+        response = session().get(url, **kwargs)
+    except requests.exceptions.RequestException:
+        _record(name, time.time() - start, error=True)
+        raise
+    elapsed = time.time() - start
+    _record(name, elapsed, error=(response.status_code >= 500))
+    logger.debug('GET %s %s %.3fs' % (url, response.status_code, elapsed))
+    return response
+
+def stats():
+    """Request counts and cumulative times per upstream for this process
+
+    @returns: dict
+    """
+    with LOCK:
+        return {
+            name: dict(data)
+            for name,data in STATS.items()
+        }
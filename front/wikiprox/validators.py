@@ -0,0 +1,123 @@
+"""front.validators -- ETag and Last-Modified for Pages, Authors and Sources
+
+For use with django.views.decorators.http.condition:
+
+    @condition(etag_func=validators.page_etag,
+               last_modified_func=validators.page_last_modified)
+    def article(request, url_title): ...
+
+Values come from models.modified_index() so a request whose validators
+match gets a 304 without fetching the document or rendering anything.
+
+Pages also show content from other documents: article pages have
+previous/next links, sources and DDR topics, and author pages list the
+author's articles.  So validators also include the versions of those
+indexes (see wikiprox.versions), and Last-Modified is the latest of the
+document's and the indexes' `modified`.  ETags include the app VERSION
+so that a release with new templates or code invalidates them.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from wikiprox import models
+from wikiprox import versions
+
+# indexes, besides the document's own, whose contents show up on its page
+DEPENDS = {
+    'page': ['article', 'source', 'facetterm'],
+    'author': ['article'],
+    'source': [],
+}
+
+
+def _modified(kind, object_id):
+    """
+    @param kind: str 'page', 'author', or 'source'
+    @param object_id: str
+    @returns: str or None
+    """
+    modified = models.modified_index(kind).get(object_id)
+    if modified and not isinstance(modified, str):
+        modified = modified.isoformat()
+    return modified
+
+def _last_modified(kind, object_id):
+    modified = _modified(kind, object_id)
+    if not modified:
+        return None
+    modified = parse_datetime(modified)
+    if timezone.is_naive(modified):
+        modified = timezone.make_aware(modified, timezone.utc)
+    return max([modified] + [
+        timestamp
+        for timestamp in [versions.modified(model) for model in DEPENDS[kind]]
+        if timestamp
+    ])
+
+def _etag(request, kind, object_id):
+    modified = _modified(kind, object_id)
+    if not modified:
+        return None
+    return hashlib.md5(':'.join([
+        kind,
+        object_id,
+        modified,
+        settings.VERSION,
+        # DRF views send JSON or HTML from the same URL
+        request.META.get('HTTP_ACCEPT', ''),
+    ] + [
+        versions.version(model) for model in DEPENDS[kind]
+    ]).encode('utf-8')).hexdigest()
+
+def resolve_title(request, url_title):
+    """models.resolve_title(), done once per request
+
+    The validators and the view both need it.
+
+    @param request: django.http.HttpRequest
+    @param url_title: str
+    @returns: (kind, object_id)
+    """
+    resolved = getattr(request, '_resolved_title', None)
+    if (not resolved) or (resolved[0] != url_title):
+        resolved = (url_title, models.resolve_title(url_title))
+        request._resolved_title = resolved
+    return resolved[1]
+
+def _page_id(request, url_title):
+    """Page ID if url_title is already canonical
+
+    Other spellings get None so the view can redirect them instead of
+    answering 304 for the canonical page.
+    """
+    kind,object_id = resolve_title(request, url_title)
+    if (kind == models.TITLE_PAGE) and (object_id == url_title):
+        return object_id
+    return None
+
+def page_etag(request, url_title, *args, **kwargs):
+    object_id = _page_id(request, url_title)
+    if object_id:
+        return _etag(request, 'page', object_id)
+    return None
+
+def page_last_modified(request, url_title, *args, **kwargs):
+    object_id = _page_id(request, url_title)
+    if object_id:
+        return _last_modified('page', object_id)
+    return None
+
+def author_etag(request, url_title, *args, **kwargs):
+    return _etag(request, 'author', url_title)
+
+def author_last_modified(request, url_title, *args, **kwargs):
+    return _last_modified('author', url_title)
+
+def source_etag(request, encyclopedia_id, *args, **kwargs):
+    return _etag(request, 'source', encyclopedia_id)
+
+def source_last_modified(request, encyclopedia_id, *args, **kwargs):
+    return _last_modified('source', encyclopedia_id)
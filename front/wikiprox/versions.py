@@ -0,0 +1,128 @@
+"""front.versions -- Content versions of the Elasticsearch indexes
+
+List caches used to expire every settings.CACHE_TIMEOUT whether or not
+anything had changed.  Instead they are keyed to a version of the
+index(es) they are built from, so they can be kept for a long time and
+are replaced soon after something is published.
+
+An index's version is its document count, the max `modified` timestamp,
+and the sum of the documents' `_seq_no`.  Every write gives the document
+a higher sequence number, so the sum changes even when `modified` does
+not (encycfacetterm has no `modified` field at all).  The probe is one
+msearch for all indexes, run at most every settings.INDEX_VERSION_INTERVAL
+seconds and shared between processes through the cache.
+
+    >>> versions.key('pages', 'article')
+    'encyc-front:pages:g0:article-2650-1593433296000-81734'
+"""
+import logging
+logger = logging.getLogger(__name__)
+from datetime import datetime, timezone
+import threading
+import time
+
+from elasticsearch import TransportError
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import docstore
+from . import keys
+
+MODELS = ['article', 'author', 'source', 'facetterm']
+KEY = 'encyc-front:index-versions'
+
+# (time checked, versions) for this process
+CHECKED = (0, {})
+LOCK = threading.Lock()
+
+
+def probe():
+    """Get current versions of all indexes from Elasticsearch
+
+    @returns: dict of model: version
+    """
+    ds = docstore.Docstore()
+    body = []
+    for model in MODELS:
+        body.append({'index': ds.index_name(model)})
+        body.append({
+            'size': 0,
+            'track_total_hits': True,
+            'aggs': {
+                'modified': {'max': {'field': 'modified'}},
+                'seq_no': {'sum': {'field': '_seq_no'}},
+            },
+        })
+    responses = ds.es.msearch(body=body)['responses']
+    data = {}
+    for model,response in zip(MODELS, responses):
+        if response.get('error'):
+            logger.error('%s version: %s' % (model, response['error']))
+            continue
+        aggs = response.get('aggregations', {})
+        data[model] = '%s-%s-%s' % (
+            response['hits']['total']['value'],
+            int(aggs.get('modified', {}).get('value') or 0),
+            int(aggs.get('seq_no', {}).get('value') or 0),
+        )
+    return data
+
+def versions():
+    """Versions of all indexes, probed at most every INDEX_VERSION_INTERVAL
+
+    If Elasticsearch cannot be reached, the last known versions are used.
+
+    @returns: dict of model: version
+    """
+    global CHECKED
+    checked,data = CHECKED
+    now = time.time()
+    if now - checked < settings.INDEX_VERSION_INTERVAL:
+        return data
+    with LOCK:
+        if CHECKED[0] != checked:
+            # another thread just did it
+            return CHECKED[1]
+        shared = cache.get(KEY)
+        if shared is None:
+            try:
+                shared = probe()
+                cache.set(KEY, shared, settings.INDEX_VERSION_INTERVAL)
+            except TransportError as err:
+                logger.error('Could not probe index versions: %s' % err)
+                shared = data
+        CHECKED = (now, shared)
+    return shared
+
+def version(model):
+    """Current version of one index
+
+    @param model: str 'article', 'author', 'source', or 'facetterm'
+    @returns: str
+    """
+    return versions().get(model, '0')
+
+def modified(model):
+    """Latest `modified` timestamp in an index, from its version
+
+    @param model: str 'article', 'author', or 'source'
+    @returns: datetime (UTC) or None
+    """
+    parts = version(model).split('-')
+    if len(parts) < 2 or not int(parts[1]):
+        return None
+    return datetime.fromtimestamp(int(parts[1]) / 1000, timezone.utc)
+
+def key(family, *models):
+    """Cache key for data built from the named indexes
+
+    See wikiprox.keys for families.
+
+    @param family: str
+    @param models: str 'article', 'author', 'source', or 'facetterm'
+    @returns: str
+    """
+    return keys.key(
+        family, *['%s-%s' % (model, version(model)) for model in models]
+    )
@@ -2,16 +2,19 @@ import json
 import os
 
 import requests
+from elasticsearch import TransportError
 
 from django.conf import settings
 from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect
 from django.http import Http404
 from django.shortcuts import redirect, render
 from django.urls import reverse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 
 from wikiprox import ddr
+from wikiprox import fulltext
 from wikiprox import models
+from wikiprox import validators
 
 
 @require_http_methods(['GET',])
@@ -33,6 +36,7 @@ def authors(request, template_name='wikiprox/authors.html'):
         'authors': models.columnizer(models.Author.authors(), 4),
     })
 
+@condition(etag_func=validators.author_etag, last_modified_func=validators.author_last_modified)
 def author(request, url_title, template_name='wikiprox/author.html'):
     try:
         author = models.Author.get(url_title)
@@ -48,26 +52,31 @@ def wiki_article(request, url_title):
     )
 
 @require_http_methods(['GET',])
+@condition(etag_func=validators.page_etag, last_modified_func=validators.page_last_modified)
 def article(request, url_title='index', printed=False, template_name='wikiprox/page.html'):
     """
     """
-    alt_title = url_title.replace('_', ' ')
+    # resolve title against cached Page and Author titles
+    # so that misses never touch Elasticsearch
+    kind,object_id = validators.resolve_title(request, url_title)
+    if kind == models.TITLE_AUTHOR:
+        return HttpResponseRedirect(reverse('wikiprox-author', args=[object_id]))
+    elif kind != models.TITLE_PAGE:
+        raise Http404
+    if url_title != object_id:
+        # one URL per article for crawlers and the response cache
+        if printed:
+            return HttpResponsePermanentRedirect(
+                reverse('wikiprox-page-print', args=[object_id])
+            )
+        return HttpResponsePermanentRedirect(
+            reverse('wikiprox-page', args=[object_id])
+        )
     try:
-        page = models.Page.get(url_title)
+        page = models.Page.get(object_id)
     except models.NotFoundError:
         page = None
     if not page:
-        try:
-            page = models.Page.get(alt_title)
-        except models.NotFoundError:
-            page = None
-    if not page:
-        # might be an author
-        author_titles = [author.title for author in models.Author.authors()]
-        if url_title in author_titles:
-            return HttpResponseRedirect(reverse('wikiprox-author', args=[url_title]))
-        elif alt_title in author_titles:
-            return HttpResponseRedirect(reverse('wikiprox-author', args=[alt_title]))
         raise Http404
     
     if (not page.published) and (not settings.MEDIAWIKI_SHOW_UNPUBLISHED):
@@ -108,6 +117,7 @@ def article(request, url_title='index', printed=False, template_name='wikiprox/p
     })
 
 @require_http_methods(['GET',])
+@condition(etag_func=validators.source_etag, last_modified_func=validators.source_last_modified)
 def source(request, encyclopedia_id, template_name='wikiprox/source.html'):
     try:
         source = models.Source.get(encyclopedia_id)
@@ -127,6 +137,7 @@ def source(request, encyclopedia_id, template_name='wikiprox/source.html'):
     })
 
 @require_http_methods(['GET',])
+@condition(etag_func=validators.page_etag, last_modified_func=validators.page_last_modified)
 def page_cite(request, url_title, template_name='wikiprox/cite.html'):
     try:
         page = models.Page.get(url_title)
@@ -140,6 +151,7 @@ def page_cite(request, url_title, template_name='wikiprox/cite.html'):
     })
 
 @require_http_methods(['GET',])
+@condition(etag_func=validators.source_etag, last_modified_func=validators.source_last_modified)
 def source_cite(request, encyclopedia_id, template_name='wikiprox/cite.html'):
     try:
         source = models.Source.get(encyclopedia_id)
@@ -150,6 +162,29 @@ def source_cite(request, encyclopedia_id, template_name='wikiprox/cite.html'):
         'citation': citation,
     })
 
+@require_http_methods(['GET',])
+def search(request, template_name='wikiprox/search.html'):
+    query = request.GET.get('q', '').strip()
+    results = None
+    error = None
+    if query:
+        try:
+            results = fulltext.search(query, cursor=request.GET.get('cursor'))
+        except ValueError:
+            error = 'That link has expired. Please search again.'
+        except TransportError:
+            error = 'Search is not available right now. Please try again later.'
+    if results:
+        for result in results['objects']:
+            result['url'] = reverse(
+                fulltext.URL_NAMES[result['model']], args=[result['id']]
+            )
+    return render(request, template_name, {
+        'query': query,
+        'results': results,
+        'error': error,
+    })
+
 @require_http_methods(['GET',])
 def related_ddr(request, url_title='index', template_name='wikiprox/related-ddr.html'):
     """List of topic terms and DDR objects relating to page